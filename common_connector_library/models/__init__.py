@@ -1,11 +1,16 @@
 # coding: utf-8
 # See LICENSE file for full copyright and licensing details.
 from . import res_partner
+from . import res_country
+from . import postal_code_state_ept
 from . import sale_workflow_process
 from . import sale_order
 from . import sale_order_line
 from . import product_product
 from . import stock_quant
+from . import stock_location
+from . import stock_move
+from . import stock_change_journal_ept
 from . import stock_quant_package
 from . import stock_picking
 from . import product_pricelist
@@ -19,5 +24,7 @@ from . import product_template
 from . import account_move
 from . import ir_cron
 from . import data_queue_mixin_ept
+from . import queue_line_payload_mixin_ept
+from . import stock_export_snapshot_mixin_ept
 from . import account_bank_statement_line
 from . import queue_line_dashboard
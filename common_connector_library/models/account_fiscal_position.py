@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
-from odoo import fields, models, api
+from odoo import fields, models, api, tools
 
 
 class AccountFiscalPosition(models.Model):
@@ -14,14 +14,71 @@ class AccountFiscalPosition(models.Model):
     def _get_fpos_by_region(self, country_id=False, state_id=False, zipcode=False, vat_required=False):
         """
         Inherited this method for selecting fiscal position based on warehouse (origin country).
+        The fiscal position is cached per company, origin country and address, the zip code is left out of the key
+        when no fiscal position of the company has a zip range.
         Migration done by Haresh Mori on September 2021
         """
-        origin_country_id = self._context.get('origin_country_ept', False)
+        if not country_id:
+            return False
+        company_id = self.env.company.id
+        if zipcode and not self._has_fpos_with_zip_range_ept(company_id):
+            zipcode = False
+        fpos_id = self._get_fpos_id_by_region_ept(company_id, self._context.get('origin_country_ept', False),
+                                                  self._context.get('is_amazon_fpos', False), country_id,
+                                                  state_id or False, zipcode or False, vat_required)
+        return self.browse(fpos_id)
+
+    @api.model
+    @tools.ormcache('company_id', 'origin_country_id', 'is_amazon_fpos', 'country_id', 'state_id', 'zipcode',
+                    'vat_required')
+    def _get_fpos_id_by_region_ept(self, company_id, origin_country_id, is_amazon_fpos, country_id, state_id,
+                                   zipcode, vat_required):
+        """
+        This method is used to search the fiscal position of an address. The result is cached as the orders come
+        from a few address shapes, the cache is cleared when a fiscal position, state or country group changes.
+        @return: Id of fiscal position or False.
+        """
+        fpos_obj = self.with_company(company_id).with_context(origin_country_ept=origin_country_id,
+                                                              is_amazon_fpos=is_amazon_fpos)
         if not origin_country_id:
-            return super(AccountFiscalPosition, self)._get_fpos_by_region(country_id=country_id, state_id=state_id,
-                                                                          zipcode=zipcode, vat_required=vat_required)
-        return self.search_fiscal_position_based_on_origin_country(origin_country_id, country_id, state_id, zipcode,
-                                                                   vat_required)
+            fpos = super(AccountFiscalPosition, fpos_obj)._get_fpos_by_region(country_id=country_id,
+                                                                               state_id=state_id, zipcode=zipcode,
+                                                                               vat_required=vat_required)
+        else:
+            fpos = fpos_obj.search_fiscal_position_based_on_origin_country(origin_country_id, country_id, state_id,
+                                                                           zipcode, vat_required)
+        return fpos.id if fpos else False
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _has_fpos_with_zip_range_ept(self, company_id):
+        """
+        This method is used to know if a fiscal position of the company has a zip range.
+        """
+        return bool(self.search_count(['|', ('zip_from', '!=', False), ('zip_to', '!=', False),
+                                       ('company_id', 'in', [company_id, False])]))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Inherited for clearing the cached fiscal positions of the addresses.
+        """
+        self.clear_caches()
+        return super(AccountFiscalPosition, self).create(vals_list)
+
+    def write(self, vals):
+        """
+        Inherited for clearing the cached fiscal positions of the addresses.
+        """
+        self.clear_caches()
+        return super(AccountFiscalPosition, self).write(vals)
+
+    def unlink(self):
+        """
+        Inherited for clearing the cached fiscal positions of the addresses.
+        """
+        self.clear_caches()
+        return super(AccountFiscalPosition, self).unlink()
 
     @api.model
     def search_fiscal_position_based_on_origin_country(self, origin_country_id, country_id, state_id, zipcode,
@@ -28,3 +28,32 @@ class DataQueueMixinEpt(models.AbstractModel):
             except Exception as error:
                 return error
         return True
+
+    def claim_data_queue_ept(self, table, queue_id, stale_after):
+        """ Uses to claim a queue for the current worker, so several cron workers can process disjoint queues at the
+            same time. A queue can be claimed when it is not being processed, or when its worker did not send a
+            heartbeat for stale_after seconds, i.e. the worker died. The claim is committed at once.
+            @param table: Table of the queue, it needs the is_process_queue and process_heartbeat columns.
+            @param queue_id: Id of the queue to claim.
+            @param stale_after: Seconds after which the claim of a silent worker expires.
+            @return: True if the queue is claimed by the current worker.
+        """
+        self._cr.execute("""UPDATE %s SET is_process_queue = True, process_heartbeat = (now() at time zone 'UTC')
+                            WHERE id = (SELECT id FROM %s
+                                        WHERE id = %%s AND (is_process_queue IS NOT TRUE OR
+                                            COALESCE(process_heartbeat, write_date) <
+                                            (now() at time zone 'UTC') - %%s * interval '1 second')
+                                        FOR UPDATE SKIP LOCKED)
+                            RETURNING id""" % (table, table), (queue_id, stale_after))
+        claimed = bool(self._cr.fetchone())
+        self._cr.commit()
+        return claimed
+
+    def touch_data_queue_heartbeat_ept(self, table, queue_ids):
+        """ Uses to refresh the heartbeat of the queues being processed, so other workers do not reclaim them.
+            It should be called before each intermediate commit of a long queue process.
+        """
+        if queue_ids:
+            self._cr.execute("""UPDATE %s SET process_heartbeat = (now() at time zone 'UTC') WHERE id IN %%s""" % table,
+                             (tuple(queue_ids),))
+        return True
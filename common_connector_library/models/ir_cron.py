@@ -1,7 +1,19 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from odoo import models
+
+import pytz
+
+from odoo import api, fields, models
+from odoo.addons.base.models.ir_cron import _intervalTypes
+
+_logger = logging.getLogger(__name__)
+
+INSTANCE_CRON_XML_ID = re.compile(r'^.+_instance_(\d+)$')
 
 
 class IrCron(models.Model):
@@ -28,3 +40,126 @@ class IrCron(models.Model):
                 "reason": "This cron task is currently being executed, If you execute this action it may cause "
                           "duplicate records."
             }
+
+    @api.model
+    def run_instance_crons_concurrently_ept(self, module, max_workers=False, per_instance_limit=1):
+        """ This method is used to run the due instance level crons of a connector in a bounded thread pool
+            instead of one after the other in a single cron worker, so one slow store does not starve the others.
+            The instance crons are recognised by their xml id "<module>.<name>_instance_<instance id>". The due
+            crons are locked in the current transaction, so the Odoo cron workers skip them while they run here.
+            :param module: Technical name of the connector module, e.g. shopify_ept.
+            :param max_workers: Number of threads, each thread holds one database connection while it runs.
+            :param per_instance_limit: Number of crons of the same instance which may run at the same time.
+            @return: Dictionary of {cron id: True if the cron succeeded else False}.
+        """
+        if not max_workers:
+            max_workers = int(self.env['ir.config_parameter'].sudo().get_param(
+                'common_connector_library.cron_executor_max_workers', 4))
+        crons_by_instance = self.lock_due_instance_crons_ept(module)
+        if not crons_by_instance:
+            return {}
+
+        lanes = self.prepare_instance_cron_lanes_ept(crons_by_instance, per_instance_limit)
+        _logger.info("Running %s instance crons of %s in %s lanes with %s workers.",
+                     sum(len(lane) for lane in lanes), module, len(lanes), max_workers)
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(lanes))),
+                                thread_name_prefix='%s_cron' % module) as executor:
+            for lane_result in executor.map(self.run_instance_cron_lane_ept, lanes):
+                results.update(lane_result)
+
+        for crons in crons_by_instance.values():
+            crons.update_instance_cron_nextcall_ept()
+        return results
+
+    @api.model
+    def lock_due_instance_crons_ept(self, module):
+        """ This method is used to search and lock the due instance crons of the connector module.
+            Crons which are already locked, i.e. running in a cron worker, are skipped.
+            @return: Dictionary of {instance id: ir.cron records ordered by nextcall}.
+        """
+        crons_by_instance = {}
+        model_data = self.env['ir.model.data'].sudo().search_read(
+            [('module', '=', module), ('model', '=', self._name), ('name', '=like', '%\\_instance\\_%')],
+            ['name', 'res_id'])
+        instance_by_cron = {}
+        for data in model_data:
+            match = INSTANCE_CRON_XML_ID.match(data['name'])
+            if match:
+                instance_by_cron[data['res_id']] = int(match.group(1))
+        if not instance_by_cron:
+            return crons_by_instance
+
+        self._cr.execute("""SELECT id FROM ir_cron
+                            WHERE id IN %s AND active AND numbercall != 0
+                                AND nextcall <= (now() at time zone 'UTC')
+                            ORDER BY nextcall, priority
+                            FOR NO KEY UPDATE SKIP LOCKED""", [tuple(instance_by_cron)])
+        for cron_id, in self._cr.fetchall():
+            instance_id = instance_by_cron[cron_id]
+            crons_by_instance[instance_id] = crons_by_instance.get(instance_id, self.browse()) + self.browse(cron_id)
+        return crons_by_instance
+
+    @staticmethod
+    def prepare_instance_cron_lanes_ept(crons_by_instance, per_instance_limit=1):
+        """ This method is used to split the crons into lanes which run sequentially in one thread.
+            Each instance gets at most per_instance_limit lanes and the lanes are returned round-robin between the
+            instances, so every store gets a worker before any store gets a second one.
+            @return: List of lanes, a lane is a list of cron ids.
+        """
+        lanes_by_instance = []
+        for crons in crons_by_instance.values():
+            lanes = [[] for _ in range(max(1, min(per_instance_limit, len(crons))))]
+            for index, cron in enumerate(crons):
+                lanes[index % len(lanes)].append(cron.id)
+            lanes_by_instance.append(lanes)
+
+        lanes = []
+        for index in range(max(len(instance_lanes) for instance_lanes in lanes_by_instance)):
+            lanes += [instance_lanes[index] for instance_lanes in lanes_by_instance if index < len(instance_lanes)]
+        return lanes
+
+    def run_instance_cron_lane_ept(self, cron_ids):
+        """ This method is used to run the crons of one lane in a worker thread. Every cron gets its own cursor and
+            environment with the user of the cron, a failing cron is rolled back and does not stop the lane.
+            @return: Dictionary of {cron id: True if the cron succeeded else False}.
+        """
+        threading.current_thread().dbname = self._cr.dbname
+        results = {}
+        for cron_id in cron_ids:
+            with self.pool.cursor() as cron_cr:
+                cron = api.Environment(cron_cr, self._uid, {})[self._name].browse(cron_id)
+                name, action, user = cron.name, cron.ir_actions_server_id.id, cron.user_id.id
+                # Like the Odoo cron worker, the job gets the previous run of the cron as lastcall.
+                lastcall = cron.lastcall
+            try:
+                with self.pool.cursor() as job_cr:
+                    env = api.Environment(job_cr, user, {'lastcall': lastcall})
+                    _logger.info("Starting instance cron '%s' (#%s).", name, cron_id)
+                    env['ir.actions.server'].browse(action).run()
+                    _logger.info("Instance cron '%s' (#%s) done.", name, cron_id)
+                results[cron_id] = True
+            except Exception:
+                _logger.exception("Instance cron '%s' (#%s) failed.", name, cron_id)
+                results[cron_id] = False
+        return results
+
+    def update_instance_cron_nextcall_ept(self):
+        """ This method is used to move the nextcall of the executed crons in the future, the same way as the Odoo
+            cron worker does it after running a job.
+        """
+        for cron in self:
+            now = fields.Datetime.context_timestamp(cron, datetime.now())
+            nextcall = fields.Datetime.context_timestamp(cron, cron.nextcall)
+            numbercall = cron.numbercall
+            while nextcall < now and numbercall:
+                if numbercall > 0:
+                    numbercall -= 1
+                if numbercall:
+                    nextcall += _intervalTypes[cron.interval_type](cron.interval_number)
+            self._cr.execute("""UPDATE ir_cron SET nextcall=%s, numbercall=%s, lastcall=%s, active=%s
+                                WHERE id=%s""",
+                             (fields.Datetime.to_string(nextcall.astimezone(pytz.UTC)), numbercall,
+                              fields.Datetime.to_string(now.astimezone(pytz.UTC)), bool(numbercall), cron.id))
+        self.invalidate_cache(['nextcall', 'numbercall', 'lastcall', 'active'], self.ids)
+        return True
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+import csv
+import logging
+from bisect import bisect_right
+from datetime import timedelta
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+POSTAL_PREFIX_FILE = "common_connector_library/data/postal_code_state_prefix.csv"
+# Loaded once per process: {country code: (sorted prefix_from list, [(prefix_from, prefix_to, state code)])}.
+_postal_prefix_index = None
+
+
+def _get_postal_prefix_index():
+    global _postal_prefix_index
+    if _postal_prefix_index is None:
+        index = {}
+        with tools.file_open(POSTAL_PREFIX_FILE, "r") as prefix_file:
+            for row in csv.DictReader(prefix_file):
+                index.setdefault(row["country_code"], []).append(
+                    (row["prefix_from"], row["prefix_to"], row["state_code"]))
+        _postal_prefix_index = {country_code: ([prefix_range[0] for prefix_range in sorted(prefix_ranges)],
+                                               sorted(prefix_ranges))
+                                for country_code, prefix_ranges in index.items()}
+    return _postal_prefix_index
+
+
+class PostalCodeStateEpt(models.Model):
+    """ Cache of the states found by the postal code API, a row without state means the API knows no state for the
+        postal code. The bundled prefix ranges are looked up first, the API is only called when it is enabled.
+    """
+    _name = "postal.code.state.ept"
+    _description = "Postal Code State"
+    _log_access = False
+
+    country_code = fields.Char(required=True)
+    zip_code = fields.Char(required=True)
+    state_id = fields.Many2one("res.country.state", ondelete="cascade")
+    create_date = fields.Datetime(default=fields.Datetime.now)
+
+    _sql_constraints = [("postal_code_state_unique", "unique(country_code, zip_code)",
+                         "The postal code is already cached for the country.")]
+
+    @api.model
+    def normalize_zip_code_ept(self, zip_code):
+        """ This method is used to remove the spaces and the extension (like the +4 of US) of a postal code.
+        """
+        return (zip_code or "").split("-")[0].replace(" ", "").upper()
+
+    @api.model
+    def find_state_by_zip_ept(self, country, zip_code):
+        """ This method is used to find the state of a postal code in the bundled prefix ranges, without any request.
+            @param country: Record of country.
+            @param zip_code: Postal code.
+            @return: Record of state if found, otherwise empty recordset.
+        """
+        state_obj = self.env["res.country.state"]
+        prefix_index = _get_postal_prefix_index().get((country.code or "").upper())
+        if not prefix_index:
+            return state_obj
+        prefix_from_list, prefix_ranges = prefix_index
+        zip_prefix = self.normalize_zip_code_ept(zip_code)[:len(prefix_from_list[0])]
+        position = bisect_right(prefix_from_list, zip_prefix) - 1
+        if len(zip_prefix) < len(prefix_from_list[0]) or position < 0 or zip_prefix > prefix_ranges[position][1]:
+            return state_obj
+        return state_obj.search([("code", "=", prefix_ranges[position][2]), ("country_id", "=", country.id)],
+                                limit=1)
+
+    @api.model
+    def get_cached_state_ept(self, country_code, zip_code):
+        """ This method is used to read the state found earlier by the postal code API.
+            @return: True if the postal code is cached, and the record of state (empty when the API knows none).
+        """
+        postal_code = self.search([("country_code", "=", country_code.upper()),
+                                   ("zip_code", "=", self.normalize_zip_code_ept(zip_code))], limit=1)
+        return bool(postal_code), postal_code.state_id
+
+    @api.model
+    def set_cached_state_ept(self, country_code, zip_code, state):
+        """ This method is used to remember the answer of the postal code API. The row is inserted by a query which
+            ignores the conflicts, so the concurrent order imports never fail on the unique constraint.
+            @param state: Record of state, empty when the API knows no state for the postal code.
+        """
+        self._cr.execute("""INSERT INTO postal_code_state_ept (country_code, zip_code, state_id, create_date)
+                            VALUES (%s, %s, %s, now() at time zone 'UTC')
+                            ON CONFLICT (country_code, zip_code) DO NOTHING""",
+                         (country_code.upper(), self.normalize_zip_code_ept(zip_code), state.id or None))
+        return True
+
+    @api.autovacuum
+    def _gc_postal_code_without_state(self):
+        """ Deletes the postal codes cached without state after the retention days (30 by default), so they are
+            requested again.
+        """
+        retention_days = int(self.env["ir.config_parameter"].sudo().get_param(
+            "common_connector_library.postal_code_cache_days", 30))
+        self._cr.execute("DELETE FROM postal_code_state_ept WHERE state_id IS NULL AND create_date < %s",
+                         (fields.Datetime.now() - timedelta(days=retention_days),))
+        _logger.info("GC'd %s postal codes cached without state.", self._cr.rowcount)
@@ -3,6 +3,7 @@
 from datetime import datetime
 from odoo.exceptions import UserError
 from odoo import models, fields, api, _
+from odoo.tools.float_utils import float_is_zero, float_round
 
 
 class ProductProduct(models.Model):
@@ -96,6 +97,25 @@ class ProductProduct(models.Model):
 
         return list(set(product_ids))
 
+    def get_products_based_on_stock_journal_ept(self, consumer, company):
+        """ This method is used to get the products whose stock changed since the last export of the consumer from
+            the stock change journal, instead of scanning the stock moves. The kits of the changed components are
+            included.
+            @param consumer: Unique name of the exporter, like the instance of a connector.
+            @param company: Company
+            @return: List of product ids, or False when the consumer has no cursor yet, and the cursor to save
+            when the products are exported.
+        """
+        product_ids, journal_cursor = self.env['stock.change.journal.ept'].get_changed_products_ept(consumer,
+                                                                                                     company)
+        if product_ids and self.search_installed_module_ept('mrp'):
+            self._cr.execute("""SELECT DISTINCT p.id FROM product_product AS p
+                                INNER JOIN mrp_bom AS mb ON mb.product_tmpl_id = p.product_tmpl_id
+                                INNER JOIN mrp_bom_line AS ml ON ml.bom_id = mb.id
+                                WHERE ml.product_id = ANY(%s)""", (product_ids,))
+            product_ids = list(set(product_ids) | {product_id for product_id, in self._cr.fetchall()})
+        return product_ids, journal_cursor
+
     def search_installed_module_ept(self, module_name):
         """ This method is used to check the module is install or not.
             @param module_name: Name of Module
@@ -122,76 +142,106 @@ class ProductProduct(models.Model):
         result = self._cr.dictfetchall()
         return result
 
-    def prepare_location_and_product_ids(self, warehouse, product_list):
+    def get_warehouse_groups_locations_ept(self, warehouse_groups):
         """
-        This method prepares location and product ids from warehouse and list of product id.
-        @param warehouse: Record of Warehouse
-        @param product_list: Ids of Product.
-        @return: Ids of locations and products in string.
-        @author: Maulik Barad on Date 21-Oct-2020.
-        Migration done by Haresh Mori on September 2021
+        This method prepares the internal locations of the warehouse groups.
+        @param warehouse_groups: Dictionary of group key and records of warehouse.
+        @return: List of location ids and list of group index of these locations.
         """
-        locations = self.env['stock.location'].search([('location_id', 'child_of', warehouse.lot_stock_id.ids)])
-        location_ids = ','.join(str(e) for e in locations.ids)
-        product_ids = ','.join(str(e) for e in product_list)
-        return location_ids, product_ids
+        location_obj = self.env['stock.location']
+        location_ids, group_indexes = [], []
+        for group_index, warehouses in enumerate(warehouse_groups.values()):
+            if not warehouses:
+                continue
+            child_location_ids = location_obj.get_child_location_ids_ept(warehouses.lot_stock_id.ids)
+            location_ids += child_location_ids
+            group_indexes += [group_index] * len(child_location_ids)
+        return location_ids, group_indexes
 
-    def check_for_bom_products(self, product_ids):
+    def get_kit_components_ept(self, product_ids):
         """
-        This method checks if any product is BoM, then get stock for them.
+        This method explodes the kit (phantom BoM) products into their storable components.
         @param product_ids: Ids of Product.
-        @return: Ids of BoM products.
-        @author: Maulik Barad on Date 21-Oct-2020.
-        Migration done by Haresh Mori on September 2021
+        @return: Dictionary of kit product id and list of tuple (component record, component qty per kit).
         """
-        bom_product_ids = []
-        mrp_module = self.search_installed_module_ept('mrp')
-        if mrp_module:
-            qry = ("""select p.id as product_id from product_product as p
-                        inner join mrp_bom as mb on mb.product_tmpl_id=p.product_tmpl_id
-                        and p.id in (%s)""" % product_ids)
-            self._cr.execute(qry)
-            bom_product_ids = self._cr.dictfetchall()
-            bom_product_ids = [product_id.get('product_id') for product_id in bom_product_ids]
-
-        return bom_product_ids
-
-    def prepare_free_qty_query(self, location_ids, simple_product_list_ids):
-        """
-        This method prepares query for fetching the free qty.
-        @param location_ids:Ids of Locations.
-        @param simple_product_list_ids: Ids of products which are not BoM.
-        @return: Prepared query in string.
-        @author: Maulik Barad on Date 21-Oct-2020.
-        Migration done by Haresh Mori on September 2021
-        """
-        query = """select pp.id as product_id,
-                COALESCE(sum(sq.quantity)-sum(sq.reserved_quantity),0) as stock
-                from product_product pp
-                left join stock_quant sq on pp.id = sq.product_id and sq.location_id in (%s)
-                where pp.id in (%s) group by pp.id;""" % (location_ids, simple_product_list_ids)
-        return query
-
-    def prepare_forecasted_qty_query(self, location_ids, simple_product_list_ids):
-        """
-        This method prepares query for fetching the forecasted qty.
-        @param location_ids:Ids of Locations.
-        @param simple_product_list_ids: Ids of products which are not BoM.
-        @return: Prepared query in string.
-        @author: Maulik Barad on Date 21-Oct-2020.
-        Migration done by Haresh Mori on September 2021
-        """
-        query = ("""select product_id,sum(stock) as stock from (select pp.id as product_id,
-                COALESCE(sum(sq.quantity)-sum(sq.reserved_quantity),0) as stock
-                from product_product pp
-                left join stock_quant sq on pp.id = sq.product_id and sq.location_id in (%s)
-                where pp.id in (%s) group by pp.id
-                union all
-                select product_id as product_id, sum(product_qty) as stock from stock_move
-                where state in ('assigned') and product_id in (%s) and location_dest_id in (%s)
-                group by product_id) as test group by test.product_id""" % (location_ids, simple_product_list_ids,
-                                                                            simple_product_list_ids, location_ids))
-        return query
+        kit_components = {}
+        if not product_ids or not self.search_installed_module_ept('mrp'):
+            return kit_components
+        bom_kits = self.env['mrp.bom']._bom_find(self.browse(product_ids), bom_type='phantom')
+        for product, bom in bom_kits.items():
+            components = []
+            _boms, bom_sub_lines = bom.explode(product, 1)
+            for bom_line, bom_line_data in bom_sub_lines:
+                component = bom_line.product_id
+                if component.type != 'product' or float_is_zero(bom_line_data['qty'],
+                                                                 precision_rounding=bom_line.product_uom_id.rounding):
+                    continue
+                uom_qty_per_kit = bom_line_data['qty'] / bom_line_data['original_qty']
+                qty_per_kit = bom_line.product_uom_id._compute_quantity(uom_qty_per_kit, component.uom_id,
+                                                                        round=False, raise_if_failure=False)
+                if qty_per_kit:
+                    components.append((component, qty_per_kit))
+            kit_components[product.id] = components
+        return kit_components
+
+    def get_qty_by_warehouse_groups_ept(self, warehouse_groups, product_list, stock_type='free_qty'):
+        """
+        This method is used to get the stock of products in several groups of warehouses with one query.
+        The stock of a kit is computed from the stock of its components as Odoo does, the stock of the components
+        is read by the same query as the other products.
+        @param warehouse_groups: Dictionary of group key and records of warehouse.
+        @param product_list: List of product ids.
+        @param stock_type: 'free_qty' for the free to use quantity, 'virtual_available' to add the quantity of the
+        reserved incoming moves.
+        @return: Dictionary of group key and dictionary with a product and its quantity.
+        """
+        group_keys = list(warehouse_groups)
+        result = {key: dict.fromkeys(product_list, 0) for key in group_keys}
+        location_ids, group_indexes = self.get_warehouse_groups_locations_ept(warehouse_groups)
+        if not product_list or not location_ids:
+            return result
+
+        kit_components = self.get_kit_components_ept(product_list)
+        stock_product_ids = set(product_list) - set(kit_components)
+        for components in kit_components.values():
+            stock_product_ids.update(component.id for component, _qty_per_kit in components)
+        stock_product_ids = list(stock_product_ids)
+
+        self.env['stock.quant'].flush(['product_id', 'location_id', 'quantity', 'reserved_quantity'])
+        query = """SELECT loc.group_index, sq.product_id, SUM(sq.quantity - sq.reserved_quantity) AS stock
+                   FROM stock_quant sq
+                   JOIN unnest(%(location_ids)s::int[], %(group_indexes)s::int[]) AS loc(location_id, group_index)
+                   ON loc.location_id = sq.location_id
+                   WHERE sq.product_id = ANY(%(product_ids)s)
+                   GROUP BY loc.group_index, sq.product_id"""
+        if stock_type == 'virtual_available':
+            self.env['stock.move'].flush(['product_id', 'location_dest_id', 'product_qty', 'state'])
+            query += """
+                   UNION ALL
+                   SELECT loc.group_index, sm.product_id, SUM(sm.product_qty) AS stock
+                   FROM stock_move sm
+                   JOIN unnest(%(location_ids)s::int[], %(group_indexes)s::int[]) AS loc(location_id, group_index)
+                   ON loc.location_id = sm.location_dest_id
+                   WHERE sm.state = 'assigned' AND sm.product_id = ANY(%(product_ids)s)
+                   GROUP BY loc.group_index, sm.product_id"""
+        self._cr.execute(query, {'location_ids': location_ids, 'group_indexes': group_indexes,
+                                 'product_ids': stock_product_ids})
+        stock = {}
+        for group_index, product_id, quantity in self._cr.fetchall():
+            key = (group_keys[group_index], product_id)
+            stock[key] = stock.get(key, 0) + (quantity or 0)
+
+        for key in group_keys:
+            group_result = result[key]
+            for product_id in group_result:
+                if product_id not in kit_components:
+                    group_result[product_id] = stock.get((key, product_id), 0)
+            for product_id, components in kit_components.items():
+                ratios = [float_round(stock.get((key, component.id), 0) / qty_per_kit,
+                                      precision_rounding=component.uom_id.rounding, rounding_method='DOWN')
+                          for component, qty_per_kit in components]
+                group_result[product_id] = min(ratios) // 1 if ratios else 0
+        return result
 
     def get_free_qty_ept(self, warehouse, product_list):
         """ This method is used to get free to use quantity based on warehouse and products.
@@ -201,25 +251,7 @@ class ProductProduct(models.Model):
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 21 September 2021 .
             Task_id: 178058
         """
-        qty_on_hand = {}
-        location_ids, product_ids = self.prepare_location_and_product_ids(warehouse, product_list)
-
-        bom_product_ids = self.check_for_bom_products(product_ids)
-        if bom_product_ids:
-            bom_products = self.with_context(warehouse=warehouse.ids).browse(bom_product_ids)
-            for product in bom_products:
-                actual_stock = getattr(product, 'free_qty')
-                qty_on_hand.update({product.id: actual_stock})
-
-        simple_product_list = list(set(product_list) - set(bom_product_ids))
-        simple_product_list_ids = ','.join(str(e) for e in simple_product_list)
-        if simple_product_list_ids:
-            qry = self.prepare_free_qty_query(location_ids, simple_product_list_ids)
-            self._cr.execute(qry)
-            result = self._cr.dictfetchall()
-            for i in result:
-                qty_on_hand.update({i.get('product_id'): i.get('stock')})
-        return qty_on_hand
+        return self.get_qty_by_warehouse_groups_ept({warehouse: warehouse}, product_list, 'free_qty')[warehouse]
 
     def get_forecasted_qty_ept(self, warehouse, product_list):
         """ This method is used to get forecast quantity based on warehouse and products.
@@ -229,22 +261,5 @@ class ProductProduct(models.Model):
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 21 September 2021 .
             Task_id: 178058
         """
-        forcasted_qty = {}
-        location_ids, product_ids = self.prepare_location_and_product_ids(warehouse, product_list)
-
-        bom_product_ids = self.check_for_bom_products(product_ids)
-        if bom_product_ids:
-            bom_products = self.with_context(warehouse=warehouse.ids).browse(bom_product_ids)
-            for product in bom_products:
-                actual_stock = getattr(product, 'free_qty') + getattr(product, 'incoming_qty')
-                forcasted_qty.update({product.id: actual_stock})
-
-        simple_product_list = list(set(product_list) - set(bom_product_ids))
-        simple_product_list_ids = ','.join(str(e) for e in simple_product_list)
-        if simple_product_list_ids:
-            qry = self.prepare_forecasted_qty_query(location_ids, simple_product_list_ids)
-            self._cr.execute(qry)
-            result = self._cr.dictfetchall()
-            for i in result:
-                forcasted_qty.update({i.get('product_id'): i.get('stock')})
-        return forcasted_qty
+        return self.get_qty_by_warehouse_groups_ept({warehouse: warehouse}, product_list,
+                                                    'virtual_available')[warehouse]
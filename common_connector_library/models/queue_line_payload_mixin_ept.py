@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+import ast
+import json
+import logging
+import zlib
+
+import psycopg2
+
+from odoo import models, fields, api
+from odoo.tools import sql
+from odoo.tools.misc import split_every
+
+_logger = logging.getLogger(__name__)
+
+PAYLOAD_COMPRESS_LEVEL = 6
+
+
+class QueueLinePayloadMixinEpt(models.AbstractModel):
+    """ Mixin for the data queue lines which keeps the imported data as zlib compressed JSON instead of plain text.
+        The model names its data field in _payload_text_field and defines it with
+        compute="_compute_payload_text" and inverse="_inverse_payload_text", so the field can still be read and
+        written as text while only the compressed payload is stored.
+    """
+    _name = "queue.line.payload.mixin.ept"
+    _description = "Queue Line Payload Mixin"
+
+    _payload_text_field = False
+    # Top level keys of the data which are never read, they are not stored.
+    _payload_strip_keys = ()
+
+    payload = fields.Binary(attachment=False, copy=False, prefetch=False,
+                            help="Compressed JSON data imported from the store.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Compress the data of the text field directly into the payload.
+        """
+        for vals in vals_list:
+            if self._payload_text_field in vals:
+                vals["payload"] = self.encode_payload_ept(vals.pop(self._payload_text_field))
+        return super(QueueLinePayloadMixinEpt, self).create(vals_list)
+
+    @api.depends("payload")
+    def _compute_payload_text(self):
+        for record in self:
+            data = record.get_payload_ept()
+            record[self._payload_text_field] = json.dumps(data) if data else False
+
+    def _inverse_payload_text(self):
+        for record in self:
+            record.payload = self.encode_payload_ept(record[self._payload_text_field])
+
+    @api.model
+    def encode_payload_ept(self, data):
+        """ Uses to compress the data of a queue line.
+            @param data: Dictionary or list, or its JSON text.
+            @return: Compressed bytes.
+        """
+        if not data:
+            return False
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        if isinstance(data, dict) and self._payload_strip_keys:
+            data = {key: value for key, value in data.items() if key not in self._payload_strip_keys}
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), PAYLOAD_COMPRESS_LEVEL)
+
+    @staticmethod
+    def decode_payload_ept(payload):
+        """ Uses to decompress the payload of a queue line.
+            @return: The stored dictionary or list, an empty dictionary when there is no payload.
+        """
+        if not payload:
+            return {}
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+    def get_payload_ept(self):
+        """ Uses to get the data of the queue line, it is decoded only when it is asked.
+        """
+        self.ensure_one()
+        # bin_size would read the size of the payload instead of its content.
+        return self.decode_payload_ept(self.with_context(bin_size=False).payload)
+
+    @api.model
+    def migrate_payload_column_ept(self, column):
+        """ Uses to compress the data of the old text column of the existing queue lines into the payload. The old
+            column is dropped when all the lines have been converted. It is called from the migration scripts.
+            @param column: Name of the old text column, the data is JSON or the string of a python dictionary.
+        """
+        if not sql.column_exists(self._cr, self._table, column):
+            return True
+        self._cr.execute('SELECT id FROM "%s" WHERE "%s" IS NOT NULL AND payload IS NULL' % (self._table, column))
+        line_ids = [row[0] for row in self._cr.fetchall()]
+        failed_count = 0
+        for batch_ids in split_every(1000, line_ids):
+            self._cr.execute('SELECT id, "%s" FROM "%s" WHERE id IN %%s' % (column, self._table), (tuple(batch_ids),))
+            for line_id, data in self._cr.fetchall():
+                try:
+                    data = json.loads(data)
+                except ValueError:
+                    try:
+                        data = ast.literal_eval(data)
+                    except (ValueError, SyntaxError):
+                        failed_count += 1
+                        continue
+                self._cr.execute('UPDATE "%s" SET payload = %%s WHERE id = %%s' % self._table,
+                                 (psycopg2.Binary(self.encode_payload_ept(data)), line_id))
+        if failed_count:
+            _logger.warning("Kept column %s of %s, data of %s queue lines could not be converted.", column,
+                            self._table, failed_count)
+            return False
+        self._cr.execute('ALTER TABLE "%s" DROP COLUMN "%s"' % (self._table, column))
+        _logger.info("Moved %s queue lines of %s into the compressed payload.", len(line_ids), self._table)
+        return True
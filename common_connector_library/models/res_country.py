@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import models, api
+
+
+class ResCountry(models.Model):
+    _inherit = "res.country"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Inherited for clearing the cached countries of the addresses, a country not found before may exist now.
+        """
+        self.clear_caches()
+        return super(ResCountry, self).create(vals_list)
+
+    def write(self, vals):
+        """ Inherited for clearing the cached countries of the addresses, when a country is renamed.
+        """
+        if 'name' in vals or 'code' in vals:
+            self.clear_caches()
+        return super(ResCountry, self).write(vals)
+
+    def unlink(self):
+        """ Inherited for clearing the cached countries of the addresses.
+        """
+        self.clear_caches()
+        return super(ResCountry, self).unlink()
+
+
+class ResCountryState(models.Model):
+    _inherit = "res.country.state"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Inherited for clearing the cached states of the addresses, a state not found before may exist now.
+        """
+        self.clear_caches()
+        return super(ResCountryState, self).create(vals_list)
+
+    def write(self, vals):
+        """ Inherited for clearing the cached states of the addresses, when a state is renamed or moved.
+        """
+        if any(field in vals for field in ('name', 'code', 'country_id')):
+            self.clear_caches()
+        return super(ResCountryState, self).write(vals)
+
+    def unlink(self):
+        """ Inherited for clearing the cached states of the addresses.
+        """
+        self.clear_caches()
+        return super(ResCountryState, self).unlink()
+
+
+class ResCountryGroup(models.Model):
+    _inherit = "res.country.group"
+
+    def write(self, vals):
+        """ Inherited for clearing the cached fiscal positions of the addresses, they are also searched by the
+            country groups.
+        """
+        if 'country_ids' in vals:
+            self.clear_caches()
+        return super(ResCountryGroup, self).write(vals)
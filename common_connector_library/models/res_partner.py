@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
-import ast
+import hashlib
 import logging
 import requests
-from odoo import models, fields, api
+from psycopg2.extras import execute_values
+from odoo import models, fields, api, tools
+from odoo.osv import expression
 
 logger = logging.getLogger(__name__)
 
+ADDRESS_FINGERPRINT_FIELDS = ['name', 'street', 'street2', 'city', 'zip', 'phone', 'state_id', 'country_id']
+
 
 class ResPartner(models.Model):
     _inherit = "res.partner"
@@ -15,6 +19,9 @@ class ResPartner(models.Model):
     allow_search_fiscal_based_on_origin_warehouse = fields.Boolean("Search fiscal based on origin warehouse?",
                                                                    default=False, help="Search fiscal position based "
                                                                                        "on origin warehouse")
+    address_fingerprint_ept = fields.Char(index=True, copy=False, readonly=True,
+                                          help="Hash of the normalized name, address and phone, used by the "
+                                               "connectors to find an existing address with an index.")
 
     def _find_partner_ept(self, vals, key_list=[], extra_domain=[]):
         """
@@ -31,6 +38,14 @@ class ResPartner(models.Model):
         Migration done by Haresh Mori on September 2021
         """
         if key_list and vals:
+            # An empty value matches any stored value in the =ilike search, the fingerprint can only be used when
+            # all its fields have a value.
+            if set(ADDRESS_FINGERPRINT_FIELDS).issubset(key_list) and \
+                    all(vals.get(key) for key in ADDRESS_FINGERPRINT_FIELDS):
+                partner = self._find_partner_by_fingerprint_ept(vals, key_list, extra_domain)
+                if partner or self.env['ir.config_parameter'].sudo().get_param(
+                        'common_connector_library.partner_fingerprint_backfilled'):
+                    return partner
             _domain = [] + extra_domain
             for key in key_list:
                 if not vals.get(key):
@@ -43,6 +58,131 @@ class ResPartner(models.Model):
             return partner
         return False
 
+    def _find_partner_by_fingerprint_ept(self, vals, key_list, extra_domain):
+        """
+        This method is used to find the partner by the indexed fingerprint of its address, instead of comparing every
+        address field with =ilike. The keys which are not part of the fingerprint are compared as before.
+        @param vals: Dictionary of the partner values.
+        @param key_list: Keys to compare, all the fingerprint fields included and set in vals.
+        @param extra_domain: Domain added to the search.
+        @return: Record of partner or empty recordset.
+        """
+        fingerprint = self._get_address_fingerprint_ept(vals)
+        _domain = [] + extra_domain
+        for key in key_list:
+            if key in ADDRESS_FINGERPRINT_FIELDS or not vals.get(key):
+                continue
+            if isinstance(vals.get(key), str):
+                _domain.append((key, '=ilike', vals.get(key)))
+            else:
+                _domain.append((key, '=', vals.get(key)))
+        partner_index = self._context.get('partner_index_ept')
+        if partner_index and fingerprint in partner_index['address']:
+            return self.browse(partner_index['address'][fingerprint]).filtered_domain(_domain)[:1]
+        return self.search(_domain + [('address_fingerprint_ept', '=', fingerprint)], limit=1)
+
+    @api.model
+    def prepare_partner_index_ept(self, emails=None, address_vals_list=None):
+        """
+        This method is used to search the partners of all the emails and addresses of a batch of orders at once.
+        The index is passed in the context as partner_index_ept, then search_partner_by_email and _find_partner_ept
+        are served from it, and the partners created or changed meanwhile are removed from it.
+        @param emails: Emails of the customers.
+        @param address_vals_list: List of the partner values of the addresses.
+        @return: {'email': {email in lower case: partner id or False}, 'address': {fingerprint: [partner ids]}}
+        """
+        partner_index = {'email': {}, 'address': {}}
+        emails = {email for email in emails or [] if email}
+        if emails:
+            partners = self.search(expression.OR([[('email', '=ilike', email)] for email in emails]))
+            for email in emails:
+                partner_index['email'][email.lower()] = partners.filtered_domain([('email', '=ilike', email)])[:1].id
+        fingerprints = {self._get_address_fingerprint_ept(vals) for vals in address_vals_list or []
+                        if all(vals.get(key) for key in ADDRESS_FINGERPRINT_FIELDS)}
+        if fingerprints:
+            if self.env['ir.config_parameter'].sudo().get_param(
+                    'common_connector_library.partner_fingerprint_backfilled'):
+                partner_index['address'] = {fingerprint: [] for fingerprint in fingerprints}
+            for partner in self.search_read([('address_fingerprint_ept', 'in', list(fingerprints))],
+                                            ['address_fingerprint_ept']):
+                partner_index['address'].setdefault(partner['address_fingerprint_ept'], []).append(partner['id'])
+        return partner_index
+
+    def _invalidate_partner_index_ept(self, emails=None, fingerprints=None):
+        """
+        This method is used to remove the emails and addresses from the partner index of the context, so they are
+        searched in the database again.
+        """
+        partner_index = self._context.get('partner_index_ept')
+        if partner_index:
+            for email in emails or []:
+                email and partner_index['email'].pop(email.lower(), None)
+            for fingerprint in fingerprints or []:
+                partner_index['address'].pop(fingerprint, None)
+        return True
+
+    @api.model
+    def _get_address_fingerprint_ept(self, vals):
+        """
+        This method is used to hash the address fields of the values, in lower case and with the spaces folded, like
+        the =ilike search would compare them.
+        @param vals: Dictionary of the partner values, the many2one fields are ids.
+        @return: Fingerprint of the address.
+        """
+        values = []
+        for key in ADDRESS_FINGERPRINT_FIELDS:
+            value = vals.get(key) or ''
+            values.append(' '.join(value.lower().split()) if isinstance(value, str) else str(value))
+        return hashlib.md5('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+    def _set_address_fingerprint_ept(self):
+        """
+        This method is used to store the address fingerprint of the partners. It is written by a query, so the
+        tracking and the write hooks of the partner are not triggered again.
+        """
+        rows = []
+        for partner in self:
+            vals = {key: partner[key].id if partner._fields[key].type == 'many2one' else partner[key] for key in
+                    ADDRESS_FINGERPRINT_FIELDS}
+            rows.append((partner.id, self._get_address_fingerprint_ept(vals)))
+        if rows and self._context.get('partner_index_ept'):
+            self._invalidate_partner_index_ept(
+                fingerprints=self.mapped('address_fingerprint_ept') + [fingerprint for _id, fingerprint in rows])
+        if rows:
+            self.flush(ADDRESS_FINGERPRINT_FIELDS)
+            execute_values(self._cr, """UPDATE res_partner SET address_fingerprint_ept = fingerprint.value
+                                        FROM (VALUES %s) AS fingerprint(id, value)
+                                        WHERE res_partner.id = fingerprint.id""", rows)
+            self.invalidate_cache(['address_fingerprint_ept'], self.ids)
+        return True
+
+    @api.model
+    def _backfill_address_fingerprint_ept(self, batch_size=5000, batch_limit=20):
+        """
+        This method is used by the cron to store the address fingerprint of the existing partners, by batches which
+        are committed one by one. The cron triggers itself again until all partners are done, then the connectors
+        stop falling back on the =ilike search.
+        @param batch_size: Number of partners per batch.
+        @param batch_limit: Number of batches per run of the cron.
+        """
+        config_parameter_obj = self.env['ir.config_parameter'].sudo()
+        if config_parameter_obj.get_param('common_connector_library.partner_fingerprint_backfilled'):
+            return True
+        for _batch in range(batch_limit):
+            self._cr.execute("SELECT id FROM res_partner WHERE address_fingerprint_ept IS NULL LIMIT %s",
+                             (batch_size,))
+            partner_ids = [partner_id for partner_id, in self._cr.fetchall()]
+            if not partner_ids:
+                config_parameter_obj.set_param('common_connector_library.partner_fingerprint_backfilled', True)
+                logger.info("Address fingerprint of all partners is stored.")
+                return True
+            self.with_context(active_test=False).browse(partner_ids)._set_address_fingerprint_ept()
+            self._cr.commit()
+            self.invalidate_cache()
+            logger.info("Address fingerprint stored for %s partners.", len(partner_ids))
+        self.env.ref('common_connector_library.ir_cron_backfill_partner_fingerprint_ept')._trigger()
+        return True
+
     def search_partner_by_email(self, email):
         """
         Usage : Search Partner by Email if not found then use =ilike operator for ignore case sensitive search
@@ -52,6 +192,9 @@ class ResPartner(models.Model):
         @Updated By : Dipak Gogiya, 21/09/2020
         :return: res.partner()
         """
+        partner_index = self._context.get('partner_index_ept')
+        if partner_index and email and email.lower() in partner_index['email']:
+            return self.browse(partner_index['email'][email.lower()])
         partner = self.search([('email', '=ilike', email)], limit=1)
         return partner
 
@@ -64,9 +207,37 @@ class ResPartner(models.Model):
             @Updated By : Dipak Gogiya, 21/09/2020
             :return: res.country()
         """
-        country = self.env['res.country'].search(['|', ('code', '=ilike', country_name_or_code),
-                                                  ('name', '=ilike', country_name_or_code)], limit=1)
-        return country
+        country_obj = self.env['res.country']
+        if not country_name_or_code:
+            return country_obj
+        return country_obj.browse(self._get_country_id_ept(country_name_or_code.lower(), self.env.lang))
+
+    @api.model
+    @tools.ormcache('country_name_or_code', 'lang')
+    def _get_country_id_ept(self, country_name_or_code, lang):
+        """ This method is used to search the country of an address. The result is cached as the orders come from
+            a few countries, the cache is cleared when a country is created, renamed or deleted.
+            @param country_name_or_code: Country name or code in lower case.
+            @param lang: Language of the country names.
+            @return: Id of country or False.
+        """
+        country = self.env['res.country'].with_context(lang=lang).search(
+            ['|', ('code', '=ilike', country_name_or_code), ('name', '=ilike', country_name_or_code)], limit=1)
+        return country.id
+
+    @api.model
+    @tools.ormcache('country_id', 'state_name_or_code')
+    def _get_state_id_ept(self, country_id, state_name_or_code):
+        """ This method is used to search the state of an address. The result is cached as the orders come from
+            a few states, the cache is cleared when a state is created, renamed or deleted.
+            @param country_id: Id of country.
+            @param state_name_or_code: State name or code in lower case.
+            @return: Id of state or False.
+        """
+        state = self.env['res.country.state'].search(['|', ('name', '=ilike', state_name_or_code),
+                                                      ('code', '=ilike', state_name_or_code),
+                                                      ('country_id', '=', country_id)], limit=1)
+        return state.id
 
     def create_or_update_state_ept(self, country_code, state_name_or_code, zip_code, country_obj=False):
         """ This method is used to search state-based country, state code or zip code.
@@ -76,14 +247,61 @@ class ResPartner(models.Model):
             country = self.get_country(country_code)
         else:
             country = country_obj
-        state = res_country_obj.search(['|', ('name', '=ilike', state_name_or_code),
-                                        ('code', '=ilike', state_name_or_code),
-                                        ('country_id', '=', country.id)], limit=1)
+        state = res_country_obj
+        if state_name_or_code:
+            state = res_country_obj.browse(self._get_state_id_ept(country.id, state_name_or_code.lower()))
 
         if not state and zip_code:
-            state = self.get_state_from_api(country_code, zip_code, country)
+            state = self.get_state_from_zip_ept(country_code, zip_code, country)
         return state
 
+    def get_state_from_zip_ept(self, country_code, zip_code, country):
+        """
+        This method is used to find the state from the zip code. The bundled postal code prefixes are searched first,
+        then the states found earlier by the zippopotam api. The api itself is only requested when it is enabled by
+        the system parameter common_connector_library.state_from_zip_api.
+        @param country_code: Code of country.
+        @param zip_code: Zip code.
+        @param country: Record of Country.
+        @return: Record of state if found, otherwise object.
+        """
+        postal_code_state_obj = self.env['postal.code.state.ept']
+        state = self.env['res.country.state']
+        if country:
+            state = postal_code_state_obj.find_state_by_zip_ept(country, zip_code)
+        country_code = country.code if country else country_code
+        if state or not country_code or not self.env['ir.config_parameter'].sudo().get_param(
+                'common_connector_library.state_from_zip_api'):
+            return state
+        is_cached, state = postal_code_state_obj.get_cached_state_ept(country_code, zip_code)
+        if is_cached:
+            return state
+        response = self.request_state_from_api(country_code, zip_code)
+        if response is None:
+            return state
+        state = self.prepare_state_from_api_response(response, country)
+        postal_code_state_obj.set_cached_state_ept(country_code, zip_code, state)
+        return state
+
+    def request_state_from_api(self, country_code, zip_code):
+        """
+        This method is used to request the place of the zip code to the zippopotam api, with the timeout of the system
+        parameter common_connector_library.state_from_zip_api_timeout (3 seconds by default).
+        @return: Dictionary of the response, empty if the api does not know the zip code, None on error.
+        """
+        timeout = float(self.env['ir.config_parameter'].sudo().get_param(
+            'common_connector_library.state_from_zip_api_timeout', 3))
+        try:
+            url = 'https://api.zippopotam.us/' + country_code + '/' + zip_code.split('-')[0]
+            response = requests.get(url, timeout=timeout)
+            if response.status_code == 404:
+                return {}
+            response.raise_for_status()
+            return response.json()
+        except Exception as error:
+            logger.info("Error when a request for state: %s", error)
+            return None
+
     def get_state_from_api(self, country_code, zip_code, country):
         """
         This method tries to find state from country and zip code from zippopotam api.
@@ -94,16 +312,18 @@ class ResPartner(models.Model):
         @author: Maulik Barad on Date 22-Oct
         Migration done by Haresh Mori on September 2021
         """
+        return self.prepare_state_from_api_response(self.request_state_from_api(country_code, zip_code), country)
+
+    def prepare_state_from_api_response(self, response, country):
+        """
+        This method is used to search or create the state of the response of the zippopotam api.
+        @param response: Dictionary of the response.
+        @param country: Record of Country.
+        @return: Record of state if found, otherwise object.
+        """
         state_obj = state = self.env['res.country.state']
         country_obj = self.env['res.country']
-        try:
-            url = 'https://api.zippopotam.us/' + country_code + '/' + zip_code.split('-')[0]
-            response = requests.get(url)
-            response = ast.literal_eval(response.content.decode('utf-8'))
-        except Exception as error:
-            logger.info("Error when a request for state: %s", error)
-            return state_obj
-        if response:
+        if response and response.get('places'):
             if not country:
                 country = self.get_country(response.get('country abbreviation'))
             if not country:
@@ -126,8 +346,8 @@ class ResPartner(models.Model):
                                           'country_id': country.id})
         return state
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         Inherited for calling onchange method.
         We got issue of not setting the gst_treatment field automatically of Indian accounting and same field is
@@ -135,9 +355,24 @@ class ResPartner(models.Model):
         @author: Maulik Barad on Date 17-Sep-2020.
         Migration done by Haresh Mori on September 2021
         """
-        partner = super(ResPartner, self).create(vals)
-        partner._onchange_country_id()
-        return partner
+        partners = super(ResPartner, self).create(vals_list)
+        for partner in partners:
+            partner._onchange_country_id()
+        partners._set_address_fingerprint_ept()
+        self._invalidate_partner_index_ept(emails=[vals.get('email') for vals in vals_list])
+        return partners
+
+    def write(self, vals):
+        """
+        Inherited for storing the address fingerprint again, when the address is changed.
+        """
+        if ('email' in vals or 'active' in vals) and self._context.get('partner_index_ept'):
+            self._invalidate_partner_index_ept(emails=self.mapped('email') + [vals.get('email')],
+                                               fingerprints=self.mapped('address_fingerprint_ept'))
+        res = super(ResPartner, self).write(vals)
+        if any(key in vals for key in ADDRESS_FINGERPRINT_FIELDS):
+            self._set_address_fingerprint_ept()
+        return res
 
     def remove_special_chars_from_partner_vals(self, partner_values):
         """
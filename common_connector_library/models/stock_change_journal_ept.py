@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+PENDING_CHANGES_KEY = "stock.change.journal.ept"
+
+
+class StockChangeJournalEpt(models.Model):
+    """ Journal of the products whose stock changed, per company. The rows are written by the hooks of stock.quant
+        and stock.move, once per transaction, and read by the stock exports of the connectors.
+        Every row stores the id of the transaction which wrote it. An export reads the rows of the transactions
+        between its cursor and the oldest transaction still running, so a row committed late is never skipped.
+    """
+    _name = "stock.change.journal.ept"
+    _description = "Stock Change Journal"
+    _log_access = False
+    _order = "id"
+
+    product_id = fields.Many2one("product.product", required=True, ondelete="cascade")
+    company_id = fields.Many2one("res.company", required=True, ondelete="cascade")
+    create_date = fields.Datetime(default=fields.Datetime.now, index=True)
+
+    def init(self):
+        """ The transaction id is a bigint, which has no ORM field.
+        """
+        self._cr.execute("""ALTER TABLE stock_change_journal_ept
+                            ADD COLUMN IF NOT EXISTS txn_id bigint NOT NULL DEFAULT txid_current()""")
+        self._cr.execute("""CREATE INDEX IF NOT EXISTS stock_change_journal_ept_company_txn_index
+                            ON stock_change_journal_ept (company_id, txn_id)""")
+        self._cr.execute("""CREATE TABLE IF NOT EXISTS stock_change_journal_cursor_ept (
+                                consumer varchar PRIMARY KEY,
+                                txn_id bigint NOT NULL)""")
+
+    @api.model
+    def add_changed_products_ept(self, product_company_pairs):
+        """ This method is used to note the products whose stock changed. They are written in the journal when the
+            transaction is committed, so a product changed many times by one transaction is written once.
+            @param product_company_pairs: Iterable of tuple (product id, company id).
+        """
+        pairs = {(product_id, company_id) for product_id, company_id in product_company_pairs if
+                 product_id and company_id}
+        if not pairs:
+            return True
+        pending_changes = self._cr.precommit.data.get(PENDING_CHANGES_KEY)
+        if pending_changes is None:
+            pending_changes = self._cr.precommit.data[PENDING_CHANGES_KEY] = set()
+            self._cr.precommit.add(self._write_pending_changes)
+        new_company_ids = {company_id for _product_id, company_id in pairs} - \
+                          {company_id for _product_id, company_id in pending_changes}
+        pending_changes.update(pairs)
+        if new_company_ids:
+            self.notify_stock_changes_ept(list(new_company_ids))
+        return True
+
+    @api.model
+    def notify_stock_changes_ept(self, company_ids):
+        """ Hook called once per transaction and company, when the stock of a product of the company changes.
+            The connectors inherit it to schedule their stock push.
+            @param company_ids: Ids of companies.
+        """
+        return True
+
+    def _write_pending_changes(self):
+        pending_changes = self._cr.precommit.data.pop(PENDING_CHANGES_KEY, set())
+        if not pending_changes:
+            return
+        product_ids, company_ids = zip(*pending_changes)
+        self._cr.execute("""INSERT INTO stock_change_journal_ept (product_id, company_id, create_date)
+                            SELECT product_id, company_id, now() at time zone 'UTC'
+                            FROM unnest(%s::int[], %s::int[]) AS change(product_id, company_id)""",
+                         (list(product_ids), list(company_ids)))
+
+    @contextmanager
+    def lock_journal_consumer_ept(self, consumer):
+        """ This method is used to make sure only one export reads the journal for a consumer at a time, like the
+            stock push and the export stock cron of the same instance. It takes a session lock, because the exports
+            commit after every batch, and the lock is released once the transaction saving the cursor is committed
+            or rolled back, so the next export reads the saved cursor.
+            @param consumer: Unique name of the reader, False when the journal is not read.
+            @return: Context manager giving False when another export of the consumer is running.
+        """
+        if not consumer:
+            yield True
+            return
+        self._cr.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (self._get_lock_key_ept(consumer),))
+        if not self._cr.fetchone()[0]:
+            _logger.info("Stock change journal of %s is read by another export, skipping.", consumer)
+            yield False
+            return
+        try:
+            yield True
+        except Exception:
+            self._cr.rollback()
+            self._unlock_journal_consumer_ept(consumer)
+            raise
+        release = partial(self._unlock_journal_consumer_ept, consumer)
+        self._cr.postcommit.add(release)
+        self._cr.postrollback.add(release)
+
+    def _get_lock_key_ept(self, consumer):
+        return "%s,%s" % (PENDING_CHANGES_KEY, consumer)
+
+    def _unlock_journal_consumer_ept(self, consumer):
+        self._cr.execute("SELECT pg_advisory_unlock(hashtext(%s))", (self._get_lock_key_ept(consumer),))
+
+    @api.model
+    def get_changed_products_ept(self, consumer, company):
+        """ This method is used to read the products whose stock changed since the last read of the consumer.
+            It must be called in lock_journal_consumer_ept, with set_journal_cursor_ept.
+            @param consumer: Unique name of the reader, like the instance of a connector.
+            @param company: Record of company.
+            @return: List of product ids, or False when the consumer has never read the journal, and the cursor to
+            save with set_journal_cursor_ept when the products are exported.
+        """
+        self._cr.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        to_txn_id = self._cr.fetchone()[0]
+        self._cr.execute("SELECT txn_id FROM stock_change_journal_cursor_ept WHERE consumer = %s", (consumer,))
+        row = self._cr.fetchone()
+        if not row:
+            return False, to_txn_id
+        self._cr.execute("""SELECT DISTINCT product_id FROM stock_change_journal_ept
+                            WHERE company_id = %s AND txn_id >= %s AND txn_id < %s""",
+                         (company.id, row[0], to_txn_id))
+        product_ids = [product_id for product_id, in self._cr.fetchall()]
+        _logger.info("Stock of %s products changed for %s.", len(product_ids), consumer)
+        return product_ids, to_txn_id
+
+    @api.model
+    def set_journal_cursor_ept(self, consumer, txn_id):
+        """ This method is used to save the position up to which the consumer has exported the journal.
+            @param consumer: Unique name of the reader.
+            @param txn_id: Cursor returned by get_changed_products_ept.
+        """
+        self._cr.execute("""INSERT INTO stock_change_journal_cursor_ept (consumer, txn_id) VALUES (%s, %s)
+                            ON CONFLICT (consumer) DO UPDATE SET txn_id = EXCLUDED.txn_id""", (consumer, txn_id))
+        return True
+
+    @api.model
+    def has_pending_changes_ept(self, consumer, company):
+        """ This method is used to know if changes committed after the last read of the consumer can be exported
+            now, they were written by a transaction which committed while an older one was still running.
+            @param consumer: Unique name of the reader.
+            @param company: Record of company.
+            @return: True if the journal has changes between the cursor of the consumer and the oldest running
+            transaction.
+        """
+        self._cr.execute("""SELECT 1 FROM stock_change_journal_ept
+                            WHERE company_id = %s
+                            AND txn_id >= (SELECT txn_id FROM stock_change_journal_cursor_ept WHERE consumer = %s)
+                            AND txn_id < txid_snapshot_xmin(txid_current_snapshot())
+                            LIMIT 1""", (company.id, consumer))
+        return bool(self._cr.fetchone())
+
+    @api.model
+    def get_waiting_changes_age_ept(self, company):
+        """ This method is used to know since how long committed changes wait for an older transaction, which is
+            still running (like a long cron job), before they can be read.
+            @param company: Record of company.
+            @return: Seconds since the oldest waiting change was written, 0 when no change is waiting.
+        """
+        self._cr.execute("""SELECT EXTRACT(EPOCH FROM (now() at time zone 'UTC') - MIN(create_date))
+                            FROM stock_change_journal_ept
+                            WHERE company_id = %s AND txn_id >= txid_snapshot_xmin(txid_current_snapshot())""",
+                         (company.id,))
+        age = self._cr.fetchone()[0]
+        return float(age or 0)
+
+    @api.model
+    def get_stock_push_retry_delay_ept(self, consumer, company, delay, max_delay=300):
+        """ This method is used by the stock pushes to know when to run again after an export. Changes which can be
+            read are pushed after the usual delay. Changes waiting for an old transaction are retried after as long
+            as they have already waited, so the delay doubles on every run up to max_delay, instead of running every
+            few seconds for as long as the old transaction lasts.
+            @param consumer: Unique name of the reader.
+            @param company: Record of company.
+            @param delay: Usual delay of the push in seconds.
+            @param max_delay: Longest delay in seconds.
+            @return: Seconds after which the push must run again, False if nothing is left to push.
+        """
+        if self.has_pending_changes_ept(consumer, company):
+            return delay
+        waiting_age = self.get_waiting_changes_age_ept(company)
+        if not waiting_age:
+            return False
+        retry_delay = int(min(max(delay, waiting_age), max_delay))
+        _logger.info("Stock changes of %s wait for an older running transaction since %s seconds, retrying in %s "
+                     "seconds.", consumer, int(waiting_age), retry_delay)
+        return retry_delay
+
+    @api.autovacuum
+    def _gc_stock_change_journal(self):
+        """ Deletes the rows older than the retention days (30 by default), the stock exports read the journal
+            far more often.
+        """
+        retention_days = int(self.env["ir.config_parameter"].sudo().get_param(
+            "common_connector_library.stock_change_journal_days", 30))
+        self._cr.execute("DELETE FROM stock_change_journal_ept WHERE create_date < %s",
+                         (fields.Datetime.now() - timedelta(days=retention_days),))
+        _logger.info("GC'd %s stock change journal rows.", self._cr.rowcount)
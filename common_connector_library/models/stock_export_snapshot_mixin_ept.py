@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from psycopg2.extras import execute_values
+
+from odoo import models, fields
+
+
+class StockExportSnapshotMixinEpt(models.AbstractModel):
+    """ Mixin for the tables which remember the last quantity exported to a store per instance, location and
+        product, so the stock export can send only the quantities which changed since.
+        The model names its key fields in _snapshot_scope_fields (e.g. instance and location) and
+        _snapshot_product_field, and declares a unique constraint on all these fields.
+    """
+    _name = "stock.export.snapshot.mixin.ept"
+    _description = "Stock Export Snapshot Mixin"
+
+    _snapshot_scope_fields = ()
+    _snapshot_product_field = False
+
+    quantity = fields.Integer(readonly=True, help="Quantity sent to the store by the last stock export.")
+    export_date = fields.Datetime(readonly=True, help="Date of the last stock export of the product.")
+
+    def get_changed_quantities_ept(self, scope, quantities):
+        """ Uses to find the quantities which are different from the last exported ones.
+            @param scope: Dictionary of the scope fields and their ids.
+            @param quantities: Dictionary of product id (of the connector layer) and quantity to export.
+            @return: Dictionary of product id and quantity, which must be exported.
+        """
+        if not quantities:
+            return {}
+        product_field = self._snapshot_product_field
+        domain = [(field, "=", scope[field]) for field in self._snapshot_scope_fields]
+        domain.append((product_field, "in", list(quantities)))
+        exported_quantities = {snapshot[product_field][0]: snapshot["quantity"] for snapshot in
+                               self.search_read(domain, [product_field, "quantity"])}
+        return {product_id: quantity for product_id, quantity in quantities.items()
+                if exported_quantities.get(product_id) != quantity}
+
+    def set_exported_quantities_ept(self, scope, quantities):
+        """ Uses to remember the quantities which are exported successfully. The rows are upserted with one query
+            as this is called for every batch of the stock export.
+            @param scope: Dictionary of the scope fields and their ids.
+            @param quantities: Dictionary of product id (of the connector layer) and exported quantity.
+        """
+        if not quantities:
+            return True
+        columns = ", ".join(list(self._snapshot_scope_fields) + [self._snapshot_product_field])
+        query = """INSERT INTO {table} ({columns}, quantity, export_date, create_uid, create_date, write_uid,
+                                        write_date)
+                   VALUES %s
+                   ON CONFLICT ({columns}) DO UPDATE
+                   SET quantity = EXCLUDED.quantity, export_date = EXCLUDED.export_date,
+                       write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+                """.format(table=self._table, columns=columns)
+        scope_values = tuple(scope[field] for field in self._snapshot_scope_fields)
+        template = "(%s, %%s, %%s, now() at time zone 'UTC', %%s, now() at time zone 'UTC', %%s, " \
+                   "now() at time zone 'UTC')" % ", ".join(["%s"] * len(scope_values))
+        rows = [scope_values + (product_id, quantity, self.env.uid, self.env.uid) for product_id, quantity in
+                quantities.items()]
+        self.flush()
+        execute_values(self._cr, query, rows, template=template)
+        self.invalidate_cache()
+        return True
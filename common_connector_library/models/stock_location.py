@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import models, api, tools
+
+
+class StockLocation(models.Model):
+    _inherit = "stock.location"
+
+    @api.model
+    @tools.ormcache('tuple(sorted(parent_ids))')
+    def get_child_location_ids_ept(self, parent_ids):
+        """ This method is used to get the ids of the active locations under the given locations. The result is
+            cached as the stock export resolves the same location trees on every run, the cache is cleared when
+            a location is created, moved, archived or deleted.
+            @param parent_ids: Ids of the parent locations.
+            @return: Tuple of location ids, the parent locations included.
+        """
+        return tuple(self.sudo().search([('location_id', 'child_of', list(parent_ids))]).ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Inherited for clearing the cache of the location trees.
+        """
+        self.clear_caches()
+        return super(StockLocation, self).create(vals_list)
+
+    def write(self, vals):
+        """ Inherited for clearing the cache of the location trees, when a location is moved or archived.
+        """
+        if 'location_id' in vals or 'active' in vals:
+            self.clear_caches()
+        return super(StockLocation, self).write(vals)
+
+    def unlink(self):
+        """ Inherited for clearing the cache of the location trees.
+        """
+        self.clear_caches()
+        return super(StockLocation, self).unlink()
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    def write(self, vals):
+        """ Inherited for noting the products in the stock change journal, when the state or the quantity of a move
+            changes, as the forecasted quantity depends on the reserved moves.
+        """
+        if "state" in vals or "product_uom_qty" in vals:
+            self.env["stock.change.journal.ept"].add_changed_products_ept(
+                (move.product_id.id, move.company_id.id) for move in self)
+        return super(StockMove, self).write(vals)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
 import logging
-from odoo import models
+from odoo import models, api
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +9,23 @@ logger = logging.getLogger(__name__)
 class StockQuant(models.Model):
     _inherit = "stock.quant"
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Inherited for noting the products of the quants in the stock change journal.
+        """
+        quants = super(StockQuant, self).create(vals_list)
+        self.env["stock.change.journal.ept"].add_changed_products_ept(
+            (quant.product_id.id, quant.company_id.id) for quant in quants)
+        return quants
+
+    def write(self, vals):
+        """ Inherited for noting the products in the stock change journal, when the quantity of a quant changes.
+        """
+        if any(field in vals for field in ("quantity", "reserved_quantity", "location_id")):
+            self.env["stock.change.journal.ept"].add_changed_products_ept(
+                (quant.product_id.id, quant.company_id.id) for quant in self)
+        return super(StockQuant, self).write(vals)
+
     def create_inventory_adjustment_ept(self, product_qty_data, location_id, auto_apply=False, name=""):
         """ This method is used to create or update product inventory.
             @param product_qty_data: Dictionary with product and it's quantity. like {'product_id':Qty,
@@ -23,10 +40,11 @@ class StockQuant(models.Model):
         """
         quant_list = self.env['stock.quant']
         if product_qty_data and location_id:
+            vals_list = []
             for product_id, product_qty in product_qty_data.items():
-                val = self.prepare_vals_for_inventory_adjustment(location_id, product_id, product_qty)
+                vals_list.append(self.prepare_vals_for_inventory_adjustment(location_id, product_id, product_qty))
                 logger.info("Product ID: %s and its Qty: %s" % (product_id, product_qty))
-                quant_list += self.with_context(inventory_mode=True).create(val)
+            quant_list = self.with_context(inventory_mode=True).create(vals_list)
             if auto_apply and quant_list:
                 quant_list.filtered(lambda x: x.product_id.tracking not in ['lot', 'serial']).with_context(
                     inventory_name=name).action_apply_inventory()
@@ -1,7 +1,7 @@
 {
     # App information
     'name': 'Shopify Odoo Connector',
-    'version': '15.0.2.0.1',
+    'version': '15.0.2.0.2',
     'category': 'Sales',
     'summary': 'Shopify Odoo Connector helps you in integrating and managing your Shopify store with Odoo by providing'
                ' the most useful features of Product and Order Synchronization.',
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """ Compress the data of the existing queue lines into their payload. """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["shopify.order.data.queue.line.ept"].migrate_payload_column_ept("order_data")
+    env["shopify.product.data.queue.line.ept"].migrate_payload_column_ept("synced_product_data")
+    env["shopify.customer.data.queue.line.ept"].migrate_payload_column_ept("shopify_synced_customer_data")
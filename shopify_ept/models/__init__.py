@@ -36,3 +36,5 @@ from . import account_bank_statement_line
 from . import data_queue_mixin_ept
 from . import order_payment_ept
 from . import queue_line_dashboard
+from . import stock_export_snapshot_ept
+from . import stock_change_journal_ept
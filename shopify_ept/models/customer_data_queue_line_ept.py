@@ -15,10 +15,13 @@ class ShopifyCustomerDataQueueLineEpt(models.Model):
     """This model is used to handel the customer data queue line"""
     _name = "shopify.customer.data.queue.line.ept"
     _description = "Shopify Synced Customer Data Line"
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "shopify_synced_customer_data"
 
     state = fields.Selection([("draft", "Draft"), ("failed", "Failed"), ("done", "Done"),
                               ("cancel", "Cancelled")], default="draft")
-    shopify_synced_customer_data = fields.Char(string="Shopify Synced Data")
+    shopify_synced_customer_data = fields.Char(string="Shopify Synced Data", compute="_compute_payload_text",
+                                               inverse="_inverse_payload_text")
     shopify_customer_data_id = fields.Text(string="Customer ID")
     synced_customer_queue_id = fields.Many2one("shopify.customer.data.queue.ept",
                                                string="Shopify Customer",
@@ -166,7 +169,7 @@ class ShopifyCustomerDataQueueLineEpt(models.Model):
                 self._cr.commit()
                 commit_count = 0
 
-            customer_data = json.loads(line.shopify_synced_customer_data)
+            customer_data = line.get_payload_ept()
             main_partner = shopify_partner_obj.shopify_create_contact_partner(customer_data, instance, line,
                                                                               log_book_id)
             if main_partner:
@@ -3,6 +3,7 @@
 
 import json
 import logging
+import time
 
 from calendar import monthrange
 from datetime import date, datetime, timedelta
@@ -158,6 +159,8 @@ class ShopifyInstanceEpt(models.Model):
     update_category_in_odoo_product = fields.Boolean(string="Update Category In Odoo Product ?",
                                                      default=False)
     shopify_stock_field = fields.Many2one('ir.model.fields', string='Stock Field')
+    shopify_stock_push = fields.Boolean("Push Stock Changes", help="Export the stock of the products a few seconds "
+                                                                   "after it changes, besides the export stock cron.")
     last_date_order_import = fields.Datetime(string="Last Date Of Unshipped Order Import",
                                              help="Last date of sync orders from Shopify to Odoo")
     shopify_section_id = fields.Many2one('crm.team', 'Sales Team')
@@ -816,6 +819,59 @@ class ShopifyInstanceEpt(models.Model):
         shopify.ShopifyResource.set_site(shop_url)
         return True
 
+    def execute_shopify_graphql(self, query, variables, version=None, max_attempts=3):
+        """ This method is used to execute a GraphQL query on the connected store and wait for the cost bucket
+            when Shopify answers with THROTTLED. The instance must be connected by connect_in_shopify.
+            @param version: API version of the GraphQL endpoint, by default the one of the connection.
+            @return: Decoded response of the query.
+        """
+        graphql = shopify.GraphQL(version)
+        for attempt in range(max_attempts):
+            result = json.loads(graphql.execute(query, variables))
+            errors = result.get("errors") or []
+            throttled = [error for error in errors if error.get("extensions", {}).get("code") == "THROTTLED"]
+            if not throttled or attempt == max_attempts - 1:
+                break
+            cost = result.get("extensions", {}).get("cost", {})
+            throttle_status = cost.get("throttleStatus", {})
+            restore_rate = throttle_status.get("restoreRate") or 50
+            missing = cost.get("requestedQueryCost", 0) - throttle_status.get("currentlyAvailable", 0)
+            time.sleep(max(1.0, float(missing) / restore_rate))
+        if result.get("errors"):
+            raise UserError("\n".join(error.get("message", "") for error in result.get("errors")))
+        return result
+
+    def shopify_bulk_operation_id_chunks(self, connection_name, search_query, chunk_size=250):
+        """ This method is used to list the ids of records (orders, products, customers) matching a search query
+            by a GraphQL bulk operation. The JSONL result is streamed, so the ids are yielded in chunks without
+            loading the whole result in memory. The instance must be connected by connect_in_shopify.
+            @param connection_name: Name of the GraphQL connection Eg: orders.
+            @param search_query: Shopify search syntax Eg: updated_at:>='2021-01-01T00:00:00Z'.
+            @return: Generator of list of ids.
+        """
+        query = "{ %s(query: %s) { edges { node { legacyResourceId } } } }" % (connection_name,
+                                                                              json.dumps(search_query))
+        chunk = []
+        for record in shopify.BulkOperation().stream(query):
+            chunk.append(record.get("legacyResourceId") or record.get("id", "").rsplit("/", 1)[-1])
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def prepare_shopify_bulk_search_query(date_field, from_date, to_date, *conditions):
+        """ This method is used to prepare the search query of a bulk operation for a date range.
+            @return: Search query Eg: updated_at:>='2021-01-01T00:00:00Z' AND updated_at:<='2021-01-31T00:00:00Z'
+        """
+        query_conditions = list(conditions)
+        if from_date:
+            query_conditions.append("%s:>='%s'" % (date_field, from_date.strftime("%Y-%m-%dT%H:%M:%SZ")))
+        if to_date:
+            query_conditions.append("%s:<='%s'" % (date_field, to_date.strftime("%Y-%m-%dT%H:%M:%SZ")))
+        return " AND ".join(query_conditions)
+
     def prepare_shopify_shop_url(self, host, api_key, password):
         """ This method is used to prepare a shop URL.
             @return shop_url
@@ -9,8 +9,8 @@ import pytz
 from odoo import models, fields, api, _
 
 from odoo.exceptions import UserError
-from ..shopify.pyactiveresource.connection import ClientError
 from .. import shopify
+from ..shopify.pyactiveresource.connection import Error
 
 utc = pytz.utc
 
@@ -51,6 +51,8 @@ class ShopifyOrderDataQueueEpt(models.Model):
                                    ("scheduled_action", "By Scheduled Action")],
                                   help="Identify the process that generated a queue.", default="import")
     is_process_queue = fields.Boolean('Is Processing Queue', default=False)
+    process_heartbeat = fields.Datetime(copy=False, readonly=True,
+                                        help="Last time the worker processing the queue reported it is alive.")
     running_status = fields.Char(default="Running...")
     queue_process_count = fields.Integer(string="Queue Process Times",
                                          help="it is used know queue how many time processed")
@@ -153,32 +155,38 @@ class ShopifyOrderDataQueueEpt(models.Model):
         return from_date, to_date
 
     def shopify_create_order_data_queues(self, instance, from_date, to_date, created_by="import",
-                                         order_type="unshipped"):
+                                         order_type="unshipped", use_bulk_operation=False):
         """
         This method used to create order data queues.
         @param : self, instance,  from_date, to_date, created_by, order_type
+        @param use_bulk_operation: List the orders by a GraphQL bulk operation instead of REST pagination, used
+        for initial loads and catch-up of long periods.
         @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 06/11/2019.
         Task Id : 157350
         @change: Maulik Barad on Date 10-Sep-2020.
         """
-        order_data_queue_line_obj = self.env["shopify.order.data.queue.line.ept"]
         start = time.time()
         order_queues = []
         instance.connect_in_shopify()
-        if order_type != "shipped":
+        if use_bulk_operation:
+            order_statuses = ["shipped"] if order_type == "shipped" else instance.shopify_order_status_ids.mapped(
+                "status")
+            queue_type = "shipped" if order_type == "shipped" else "unshipped"
+            for order_status in order_statuses:
+                order_queues += self.shopify_bulk_order_request(instance, from_date, to_date, order_status,
+                                                                queue_type, created_by)
+            if order_type == "shipped":
+                instance.last_shipped_order_import_date = to_date - timedelta(days=2)
+            else:
+                instance.last_date_order_import = to_date - timedelta(days=2)
+        elif order_type != "shipped":
             queue_type = 'unshipped'
             for order_status_id in instance.shopify_order_status_ids:
                 order_status = order_status_id.status
                 order_ids = self.shopify_order_request(instance, from_date, to_date, order_status)
 
                 if order_ids:
-                    order_queues = order_data_queue_line_obj.create_order_data_queue_line(order_ids,
-                                                                                          instance,
-                                                                                          queue_type,
-                                                                                          created_by)
-                    if len(order_ids) >= 250:
-                        order_queue_list = self.list_all_orders(order_ids, instance, created_by, queue_type)
-                        order_queues += order_queue_list
+                    order_queues += self.list_all_orders(order_ids, instance, created_by, queue_type)
                 instance.last_date_order_import = to_date - timedelta(days=2)
         else:
             order_queues = self.shopify_shipped_order_request(instance, from_date, to_date, created_by="import",
@@ -207,23 +215,37 @@ class ShopifyOrderDataQueueEpt(models.Model):
 
         return order_ids
 
+    def shopify_bulk_order_request(self, instance, from_date, to_date, order_status, queue_type, created_by):
+        """ This method is used to create order queues from the orders listed by a bulk operation. The order ids
+            are received in chunks of 250 and the orders of each chunk are requested by REST, so the queue lines
+            keep the same order data as the regular import.
+            @return: order_queue_list
+        """
+        order_data_queue_line_obj = self.env["shopify.order.data.queue.line.ept"]
+        order_queue_list = []
+        search_query = instance.prepare_shopify_bulk_search_query("updated_at", from_date, to_date,
+                                                                  "fulfillment_status:%s" % order_status)
+        try:
+            for order_ids in instance.shopify_bulk_operation_id_chunks("orders", search_query):
+                orders = shopify.Order().find(ids=",".join(order_ids), status="any", limit=250)
+                if orders:
+                    order_queue_list += order_data_queue_line_obj.create_order_data_queue_line(orders, instance,
+                                                                                               queue_type,
+                                                                                               created_by)
+        except Exception as error:
+            raise UserError(error)
+        return order_queue_list
+
     def shopify_shipped_order_request(self, instance, from_date, to_date, order_type, created_by):
         """ This method is used to import shipped order from the shopify store to Odoo.
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 30 December 2020 .
             Task_id:169381 - Gift card order import changes
         """
-        order_data_queue_line_obj = self.env["shopify.order.data.queue.line.ept"]
         order_queues = []
         queue_type = 'shipped'
         order_ids = self.shopify_order_request(instance, from_date, to_date, order_type)
         if order_ids:
-            order_queues = order_data_queue_line_obj.create_order_data_queue_line(order_ids,
-                                                                                  instance,
-                                                                                  queue_type,
-                                                                                  created_by)
-            if len(order_ids) >= 250:
-                order_queue_list = self.list_all_orders(order_ids, instance, created_by, queue_type)
-                order_queues += order_queue_list
+            order_queues = self.list_all_orders(order_ids, instance, created_by, queue_type)
 
         return order_queues
 
@@ -238,37 +260,19 @@ class ShopifyOrderDataQueueEpt(models.Model):
         Task_id : 157350
         Modify on date 27/12/2019 Taken pagination changes
         @change : Maulik Barad on Date 10-Sep-2020.
+        @change: The pages, first one included, are iterated lazily and the next page is prefetched while the
+        queue lines of the current one are created.
         """
         order_data_queue_line_obj = self.env["shopify.order.data.queue.line.ept"]
         order_queue_list = []
-        catch = ""
-
-        while result:
-            page_info = ""
-            # link: link of next page.
-            link = shopify.ShopifyResource.connection.response.headers.get('Link')
-            if not link or not isinstance(link, str):
-                return order_queue_list
-
-            for page_link in link.split(','):
-                if page_link.find('next') > 0:
-                    page_info = page_link.split(';')[0].strip('<>').split('page_info=')[1]
-                    try:
-                        result = shopify.Order().find(limit=250, page_info=page_info)
-                    except ClientError as error:
-                        if hasattr(error,
-                                   "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                            time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                            result = shopify.Order().find(limit=250, page_info=page_info)
-                    except Exception as error:
-                        raise UserError(error)
-                    if result:
-                        order_queues = order_data_queue_line_obj.create_order_data_queue_line(result, instance,
-                                                                                              queue_type,
-                                                                                              created_by)
-                        order_queue_list += order_queues
-            if catch == page_info:
-                break
+        try:
+            for orders in shopify.PaginatedIterator(result, prefetch=True):
+                if orders:
+                    order_queue_list += order_data_queue_line_obj.create_order_data_queue_line(orders, instance,
+                                                                                               queue_type,
+                                                                                               created_by)
+        except Error as error:
+            raise UserError(error)
         return order_queue_list
 
     def import_order_process_by_remote_ids(self, instance, order_ids):
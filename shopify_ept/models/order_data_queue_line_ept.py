@@ -4,13 +4,33 @@ import json
 import logging
 import time
 from odoo import models, fields
+from odoo.tools.misc import split_every
 
 _logger = logging.getLogger("Shopify Order Queue Line")
 
+SHOPIFY_ORDER_RISK_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on Order {
+      legacyResourceId
+      risks {
+        display
+        level
+        message
+      }
+    }
+  }
+}
+"""
+# GraphQL gives the level of a risk, REST gave the matching recommendation.
+SHOPIFY_RISK_RECOMMENDATION_BY_LEVEL = {"HIGH": "cancel", "MEDIUM": "investigate", "LOW": "accept"}
+
 
 class ShopifyOrderDataQueueLineEpt(models.Model):
     _name = "shopify.order.data.queue.line.ept"
     _description = "Shopify Order Data Queue Line"
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "order_data"
 
     shopify_order_data_queue_id = fields.Many2one("shopify.order.data.queue.ept",
                                                   ondelete="cascade")
@@ -21,7 +41,8 @@ class ShopifyOrderDataQueueLineEpt(models.Model):
     shopify_order_id = fields.Char(help="Id of imported order.", copy=False)
     sale_order_id = fields.Many2one("sale.order", copy=False,
                                     help="Order created in Odoo.")
-    order_data = fields.Text(help="Data imported from Shopify of current order.", copy=False)
+    order_data = fields.Text(help="Data imported from Shopify of current order.", copy=False,
+                             compute="_compute_payload_text", inverse="_inverse_payload_text")
 
     customer_name = fields.Text(help="Shopify Customer Name", copy=False)
 
@@ -62,12 +83,19 @@ class ShopifyOrderDataQueueLineEpt(models.Model):
         orders_data.reverse()
         order_queue_list = []
         is_new_order = bool(self._context.get('is_new_order'))
+        risks_by_order = {}
+        # The queues of the order update webhook update existing orders, which do not read the risks.
+        if created_by != "webhook" or is_new_order:
+            risks_by_order = self.prefetch_shopify_order_risks(
+                [str(order.get("id") if isinstance(order, dict) else order.id) for order in orders_data], instance)
         for order in orders_data:
             if created_by == "webhook" and not is_new_order:
                 order_queue, need_to_create_queue = self.search_webhook_order_queue(created_by, instance, order,
                                                                                     queue_type, need_to_create_queue)
             elif not is_new_order:
                 order = order.to_dict()
+            if str(order.get("id")) in risks_by_order:
+                order = dict(order, risks=risks_by_order[str(order.get("id"))])
 
             if need_to_create_queue:
                 order_queue = self.shopify_create_order_queue(instance, queue_type, created_by)
@@ -94,6 +122,39 @@ class ShopifyOrderDataQueueLineEpt(models.Model):
 
         return order_queue_list
 
+    def prefetch_shopify_order_risks(self, order_ids, instance, chunk_size=50):
+        """ This method is used to request the risks of the orders by GraphQL, for a chunk of orders per query
+            instead of one OrderRisk request per order while the orders are imported. The risks are stored in the
+            data of the queue lines under the key risks. The orders of a failed chunk get no risks, so their risks
+            are requested by REST when they are imported.
+            :param order_ids: Shopify ids of the orders.
+            @return: Dictionary of order id and list of risks, in the format of the OrderRisk REST API.
+        """
+        risks_by_order = {}
+        order_ids = [order_id for order_id in order_ids if order_id]
+        if not order_ids:
+            return risks_by_order
+        instance.connect_in_shopify()
+        for chunk_ids in split_every(chunk_size, order_ids):
+            try:
+                result = instance.execute_shopify_graphql(
+                    SHOPIFY_ORDER_RISK_QUERY, {"ids": ["gid://shopify/Order/%s" % order_id for order_id in chunk_ids]})
+            except Exception as error:
+                _logger.info("Risks of the orders are not received, they are requested while importing the "
+                             "orders.\nError: %s", error)
+                continue
+            for node in result.get("data", {}).get("nodes") or []:
+                if not node or not node.get("legacyResourceId"):
+                    continue
+                order_id = node.get("legacyResourceId")
+                risks_by_order[order_id] = [{"order_id": int(order_id),
+                                             "display": risk.get("display"),
+                                             "message": risk.get("message"),
+                                             "recommendation": SHOPIFY_RISK_RECOMMENDATION_BY_LEVEL.get(
+                                                 risk.get("level"), "accept")}
+                                            for risk in node.get("risks") or []]
+        return risks_by_order
+
     def search_webhook_order_queue(self, created_by, instance, order, queue_type, need_to_create_queue):
         """ This method is used to search the webhook order queue.
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 27 October 2020 .
@@ -164,10 +225,6 @@ class ShopifyOrderDataQueueLineEpt(models.Model):
         shopify_order_queue_obj = self.env["shopify.order.data.queue.ept"]
         order_queue_ids = []
 
-        self.env.cr.execute(
-            """update shopify_order_data_queue_ept set is_process_queue = False where is_process_queue = True""")
-        self._cr.commit()
-
         query = """select queue.id
                 from shopify_order_data_queue_line_ept as queue_line
                 inner join shopify_order_data_queue_ept as queue on queue_line.shopify_order_data_queue_id = queue.id
@@ -194,17 +251,22 @@ class ShopifyOrderDataQueueLineEpt(models.Model):
         """
         ir_model_obj = self.env["ir.model"]
         common_log_book_obj = self.env["common.log.book.ept"]
+        data_queue_mixin_obj = self.env["data.queue.mixin.ept"]
         start = time.time()
         order_queue_process_cron_time = queues.shopify_instance_id.get_shopify_cron_execution_time(
             "shopify_ept.process_shopify_order_queue")
 
         for queue in queues:
+            # Skip the queues which are being processed by another cron worker.
+            if not data_queue_mixin_obj.claim_data_queue_ept("shopify_order_data_queue_ept", queue.id,
+                                                             order_queue_process_cron_time):
+                continue
             order_data_queue_line_ids = queue.order_data_queue_line_ids.filtered(lambda x: x.state == "draft")
 
             # For counting the queue crashes and creating schedule activity for the queue.
             queue.queue_process_count += 1
             if queue.queue_process_count > 3:
-                queue.is_action_require = True
+                queue.write({"is_action_require": True, "is_process_queue": False})
                 note = "<p>Need to process this order queue manually.There are 3 attempts been made by " \
                        "automated action to process this queue,<br/>- Ignore, if this queue is already processed.</p>"
                 queue.message_post(body=note)
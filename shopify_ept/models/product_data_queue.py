@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
 
-import time
 import json
 import logging
 import re
@@ -10,7 +9,7 @@ from datetime import datetime, timedelta
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 from .. import shopify
-from ..shopify.pyactiveresource.connection import ClientError
+from ..shopify.pyactiveresource.connection import Error
 
 _logger = logging.getLogger("Shopify Product Queue")
 
@@ -124,7 +123,7 @@ class ShopifyProductDataQueue(models.Model):
 
     def shopify_create_product_data_queue(self, instance, import_based_on='', from_date=False,
                                           to_date=False, skip_existing_product=False,
-                                          template_ids=""):
+                                          template_ids="", use_bulk_operation=False):
         """
         This method used to create a product data queue while syncing product from Shopify to Odoo.
         @param instance: Shopify Instance.
@@ -134,6 +133,7 @@ class ShopifyProductDataQueue(models.Model):
         @param skip_existing_product: skip_existing_product False then it will update product values existing sync
         product, if True then it will not update product values in existing products.
         @param template_ids: Ids of shopify template.
+        @param use_bulk_operation: List the products by a GraphQL bulk operation instead of REST pagination.
         @author: Maulik Barad on Date 28-Aug-2020.
         @return: List of Product queues.
         """
@@ -144,6 +144,13 @@ class ShopifyProductDataQueue(models.Model):
             product_queue_list += self.import_products_by_remote_ids(template_ids, instance)
             if product_queue_list:
                 results = True
+        elif use_bulk_operation:
+            date_field = "created_at" if import_based_on == "create_date" else "updated_at"
+            product_queue_list += self.shopify_bulk_product_request(instance, date_field, from_date, to_date,
+                                                                    skip_existing_product)
+            results = bool(product_queue_list)
+            if results:
+                instance.shopify_last_date_product_import = datetime.now()
         else:
             if import_based_on == "create_date":
                 results = shopify.Product().find(status='active', created_at_min=from_date, created_at_max=to_date,
@@ -152,10 +159,7 @@ class ShopifyProductDataQueue(models.Model):
                 results = shopify.Product().find(status='active', updated_at_min=from_date, updated_at_max=to_date,
                                                  limit=250)
 
-            product_queue_list += self.create_product_queues(instance, results, skip_existing_product)
-
-            if len(results) >= 250:
-                product_queue_list += self.shopify_list_all_products(instance, results, skip_existing_product)
+            product_queue_list += self.shopify_list_all_products(instance, results, skip_existing_product)
             if results:
                 instance.shopify_last_date_product_import = datetime.now()
         if not results:
@@ -164,6 +168,22 @@ class ShopifyProductDataQueue(models.Model):
 
         return product_queue_list
 
+    def shopify_bulk_product_request(self, instance, date_field, from_date, to_date, skip_existing_product):
+        """ This method is used to create product queues from the products listed by a bulk operation. The product
+            ids are received in chunks of 250 and the products of each chunk are requested by REST.
+            @return: product_queue_list
+        """
+        product_queue_list = []
+        search_query = instance.prepare_shopify_bulk_search_query(date_field, from_date, to_date, "status:active")
+        try:
+            for template_ids in instance.shopify_bulk_operation_id_chunks("products", search_query):
+                results = shopify.Product().find(ids=",".join(template_ids), limit=250)
+                if results:
+                    product_queue_list += self.create_product_queues(instance, results, skip_existing_product)
+        except Exception as error:
+            raise UserError(error)
+        return product_queue_list
+
     def import_products_by_remote_ids(self, template_ids, instance):
         """ This method is used to import Shopify products into Odoo using remote ids(open product in Shopify store,
             in URL you can find remote-id,ex:https://new-emipro.myshopify.com/admin/products/4333282951223,
@@ -196,30 +216,15 @@ class ShopifyProductDataQueue(models.Model):
         """This method used to call the page wise data of product to import from Shopify to Odoo.
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 14/10/2019.
             Modify on date 27/12/2019 Taken pagination changes.
+            The pages, first one included, are iterated lazily with the next page prefetched in background.
         """
         product_queue_list = []
-        catch = ""
-        while result:
-            page_info = ""
-            link = shopify.ShopifyResource.connection.response.headers.get("Link")
-            if not link or not isinstance(link, str):
-                return product_queue_list
-            for page_link in link.split(","):
-                if page_link.find("next") > 0:
-                    page_info = page_link.split(";")[0].strip("<>").split("page_info=")[1]
-                    try:
-                        result = shopify.Product().find(page_info=page_info, limit=250)
-                    except ClientError as error:
-                        if hasattr(error,
-                                   "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                            time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                            result = shopify.Product().find(page_info=page_info, limit=250)
-                    except Exception as error:
-                        raise UserError(error)
-                    if result:
-                        product_queue_list += self.create_product_queues(instance, result, skip_existing_product)
-            if catch == page_info:
-                break
+        try:
+            for products in shopify.PaginatedIterator(result, prefetch=True):
+                if products:
+                    product_queue_list += self.create_product_queues(instance, products, skip_existing_product)
+        except Error as error:
+            raise UserError(error)
         return product_queue_list
 
     def shopify_create_product_queue(self, instance, created_by="import", skip_existing_product=False):
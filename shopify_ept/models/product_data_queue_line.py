@@ -14,10 +14,12 @@ _logger = logging.getLogger("Shopify Product Queue Line")
 class ShopifyProductDataQueueLineEpt(models.Model):
     _name = "shopify.product.data.queue.line.ept"
     _description = "Shopify Product Data Queue Line"
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "synced_product_data"
 
     shopify_instance_id = fields.Many2one("shopify.instance.ept", string="Instance")
     last_process_date = fields.Datetime()
-    synced_product_data = fields.Text()
+    synced_product_data = fields.Text(compute="_compute_payload_text", inverse="_inverse_payload_text")
     product_data_id = fields.Char()
     state = fields.Selection([("draft", "Draft"), ("failed", "Failed"), ("done", "Done"),
                               ("cancel", "Cancelled")],
@@ -164,8 +166,7 @@ class ShopifyProductDataQueueLineEpt(models.Model):
         product_queue_lines = self.query_find_queue_line_for_import_image()
         for queue in product_queue_lines:
             product_queue = self.browse(queue)
-            template_data = product_queue.synced_product_data
-            template_data = json.loads(template_data)
+            template_data = product_queue.get_payload_ept()
             shopify_template = shopify_template_obj.search([('shopify_tmpl_id', '=', product_queue.product_data_id),
                                                             ('shopify_instance_id', '=',
                                                              product_queue.shopify_instance_id.id)], limit=1)
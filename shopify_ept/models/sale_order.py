@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
 
-import json
 import logging
 from datetime import datetime, timedelta
 import time
@@ -13,7 +12,6 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 from ..shopify.pyactiveresource.util import xml_to_dict
 from .. import shopify
-from ..shopify.pyactiveresource.connection import ClientError
 
 utc = pytz.utc
 
@@ -297,15 +295,23 @@ class SaleOrder(models.Model):
         commit_count = 0
         instance = log_book.shopify_instance_id
 
+        if "shopify_variant_index" not in self._context:
+            variant_index = self.prepare_shopify_variant_index(order_data_lines, instance)
+            customer_index, partner_index = self.prepare_shopify_customer_index(order_data_lines, instance)
+            return self.with_context(shopify_variant_index=variant_index, shopify_customer_index=customer_index,
+                                     partner_index_ept=partner_index).import_shopify_orders(order_data_lines,
+                                                                                            log_book)
+
         instance.connect_in_shopify()
 
         for order_data_line in order_data_lines:
             if commit_count == 5:
+                self.env["data.queue.mixin.ept"].touch_data_queue_heartbeat_ept(
+                    "shopify_order_data_queue_ept", order_data_lines.shopify_order_data_queue_id.ids)
                 self._cr.commit()
                 commit_count = 0
             commit_count += 1
-            order_data = order_data_line.order_data
-            order_response = json.loads(order_data)
+            order_response = order_data_line.get_payload_ept()
 
             order_number = order_response.get("order_number")
             shopify_financial_status = order_response.get("financial_status")
@@ -356,7 +362,10 @@ class SaleOrder(models.Model):
             location_vals = self.set_shopify_location_and_warehouse(order_response, instance, pos_order)
             sale_order.write(location_vals)
 
-            risk_result = shopify.OrderRisk().find(order_id=order_response.get("id"))
+            if "risks" in order_response:
+                risk_result = order_response.get("risks")
+            else:
+                risk_result = shopify.OrderRisk().find(order_id=order_response.get("id"))
             if risk_result:
                 order_risk_obj.shopify_create_risk_in_order(risk_result, sale_order)
                 risk = sale_order.risk_ids.filtered(lambda x: x.recommendation != "accept")
@@ -490,6 +499,8 @@ class SaleOrder(models.Model):
                     shopify_product_template_obj.shopify_sync_products(False, line_product_id,
                                                                        instance, log_book_id,
                                                                        order_data_queue_line)
+                    # The sync may have created the variant, so the cached miss is not valid anymore.
+                    self.invalidate_shopify_variant_index(line)
                     shopify_variant = self.search_shopify_variant(line, instance)
                     if not shopify_variant:
                         message = "Product [%s][%s] not found for Order %s" % (
@@ -507,18 +518,119 @@ class SaleOrder(models.Model):
             Task_id: 167537
         """
         shopify_variant = False
-        shopify_product_obj = self.env["shopify.product.product.ept"]
         sku = line.get("sku") or False
         if line.get("variant_id", None):
-            shopify_variant = shopify_product_obj.search(
-                [("variant_id", "=", line.get("variant_id")),
-                 ("shopify_instance_id", "=", instance.id)])
+            shopify_variant = self.search_shopify_variant_from_index("variant_id", line.get("variant_id"), instance)
         if not shopify_variant and sku:
-            shopify_variant = shopify_product_obj.search(
-                [("default_code", "=", sku),
-                 ("shopify_instance_id", "=", instance.id)])
+            shopify_variant = self.search_shopify_variant_from_index("default_code", sku, instance)
+        return shopify_variant
+
+    def prepare_shopify_variant_index(self, order_data_lines, instance):
+        """ This method is used to search the Shopify variants of all the order lines of the queue lines at once.
+            The variants are searched by the variant id and by the SKU in one query each, and the later searches of
+            the order import are served from the returned index.
+            :param order_data_lines: Records of the order queue lines.
+            @return: {"variant_id": {variant id: [ids]}, "default_code": {sku: [ids]}}
+        """
+        shopify_product_obj = self.env["shopify.product.product.ept"]
+        variant_index = {"variant_id": {}, "default_code": {}}
+        for order_data_line in order_data_lines:
+            for line in order_data_line.get_payload_ept().get("line_items", []):
+                if line.get("variant_id"):
+                    variant_index["variant_id"].setdefault(str(line.get("variant_id")), [])
+                if line.get("sku"):
+                    variant_index["default_code"].setdefault(line.get("sku"), [])
+
+        for field_name, index in variant_index.items():
+            if not index:
+                continue
+            shopify_variants = shopify_product_obj.search_read([(field_name, "in", list(index.keys())),
+                                                                ("shopify_instance_id", "=", instance.id)],
+                                                               [field_name], order="id")
+            for shopify_variant in shopify_variants:
+                index[shopify_variant[field_name]].append(shopify_variant["id"])
+        return variant_index
+
+    def prepare_shopify_customer_index(self, order_data_lines, instance):
+        """ This method is used to resolve the customers and addresses of all the orders of the queue lines at once.
+            The Shopify customers are searched in one query, the emails and addresses through the partner index of
+            the common connector, and the contacts of the new customers are created with one create.
+            :param order_data_lines: Records of the order queue lines.
+            @return: Dictionary of Shopify customer id and partner id, and the partner index.
+        """
+        partner_obj = self.env["res.partner"]
+        shopify_partner_obj = self.env["shopify.res.partner.ept"]
+        customers = {}
+        address_vals_list = []
+        for order_data_line in order_data_lines:
+            order_response = order_data_line.get_payload_ept()
+            if order_response.get("source_name", "") == "pos" or \
+                    str(instance.import_order_after_date) > self.convert_order_date(order_response):
+                continue
+            customer = order_response.get("customer") or {}
+            if customer.get("id"):
+                customers.setdefault(str(customer.get("id")), customer)
+            for address in [order_response.get("billing_address"), order_response.get("shipping_address")]:
+                if address and (address.get("first_name") or address.get("last_name")):
+                    address_vals_list.append(shopify_partner_obj.shopify_prepare_partner_vals(address))
+
+        customer_index = {}
+        if customers:
+            shopify_partners = shopify_partner_obj.search_read([("shopify_customer_id", "in", list(customers)),
+                                                                ("shopify_instance_id", "=", instance.id)],
+                                                               ["shopify_customer_id", "partner_id"], order="id")
+            for shopify_partner in shopify_partners:
+                if shopify_partner["partner_id"]:
+                    customer_index.setdefault(shopify_partner["shopify_customer_id"],
+                                              shopify_partner["partner_id"][0])
+        emails = [customer.get("email") for customer_id, customer in customers.items() if
+                  customer_id not in customer_index]
+        partner_index = partner_obj.prepare_partner_index_ept(emails, address_vals_list)
+
+        new_customers = {}
+        for customer_id, customer in customers.items():
+            email = customer.get("email")
+            if customer_id in customer_index or (email and partner_index["email"].get(email.lower(), True)) or \
+                    not any([customer.get("first_name"), customer.get("last_name"), email]):
+                continue
+            new_customers[customer_id] = shopify_partner_obj.shopify_prepare_contact_partner_vals(customer)
+        if new_customers:
+            partners = partner_obj.with_context(partner_index_ept=partner_index).create(list(new_customers.values()))
+            shopify_partner_obj.create([{"shopify_customer_id": customer_id, "shopify_instance_id": instance.id,
+                                         "partner_id": partner.id} for customer_id, partner in
+                                        zip(new_customers, partners)])
+            customer_index.update(zip(new_customers, partners.ids))
+            _logger.info("Created %s Shopify customers of the queue lines.", len(partners))
+        return customer_index, partner_index
+
+    def search_shopify_variant_from_index(self, field_name, value, instance):
+        """ This method is used to search the Shopify variant by variant id or SKU. It is served from the variant
+            index of the context when it is there, otherwise it searches and remembers the result.
+            :param field_name: variant_id or default_code.
+            @return: Records of shopify.product.product.ept.
+        """
+        shopify_product_obj = self.env["shopify.product.product.ept"]
+        index = self._context.get("shopify_variant_index", {}).get(field_name)
+        key = str(value) if field_name == "variant_id" else value
+        if index is not None and key in index:
+            return shopify_product_obj.browse(index[key])
+
+        shopify_variant = shopify_product_obj.search([(field_name, "=", value),
+                                                      ("shopify_instance_id", "=", instance.id)])
+        if index is not None:
+            index[key] = shopify_variant.ids
         return shopify_variant
 
+    def invalidate_shopify_variant_index(self, line):
+        """ This method is used to remove the variant id and SKU of the order line from the variant index, so the
+            next search of this line is done in the database again.
+        """
+        variant_index = self._context.get("shopify_variant_index")
+        if variant_index:
+            variant_index["variant_id"].pop(str(line.get("variant_id")), None)
+            variant_index["default_code"].pop(line.get("sku"), None)
+        return True
+
     def shopify_create_order(self, instance, partner, shipping_address, invoice_address,
                              order_data_queue_line, order_response, log_book_id, lines, order_number):
         """This method used to create a sale order and it's line.
@@ -675,14 +787,12 @@ class SaleOrder(models.Model):
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 14/11/2019.
             Task Id : 157350
         """
-        shopify_product_obj = self.env["shopify.product.product.ept"]
         variant_id = line.get("variant_id")
-        shopify_product = shopify_product_obj.search(
-            [("shopify_instance_id", "=", instance.id), ("variant_id", "=", variant_id)])
+        shopify_product = self.search_shopify_variant_from_index("variant_id", variant_id, instance)
         if not shopify_product:
-            shopify_product = shopify_product_obj.search([("shopify_instance_id", "=", instance.id),
-                                                          ("default_code", "=", line.get("sku"))])
+            shopify_product = self.search_shopify_variant_from_index("default_code", line.get("sku"), instance)
             shopify_product.write({"variant_id": variant_id})
+            self.invalidate_shopify_variant_index(line)
         return shopify_product
 
     def shopify_create_sale_order_line(self, line, product, quantity, product_name, price,
@@ -1169,15 +1279,12 @@ class SaleOrder(models.Model):
             Task_id: 167930 - Update order status changes as per v13
             Migration done by Haresh Mori on October 2021
         """
+        fulfillment_result = False
         try:
             new_fulfillment = shopify.Fulfillment(fulfillment_vals)
             fulfillment_result = new_fulfillment.save()
             if not fulfillment_result:
                 return False, fulfillment_result, new_fulfillment
-        except ClientError as error:
-            if hasattr(error, "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                fulfillment_result = new_fulfillment.save()
         except Exception as error:
             message = "%s" % str(error)
             _logger.info(message)
@@ -1254,7 +1361,7 @@ class SaleOrder(models.Model):
         for queue_line in queue_lines:
             message = ""
             shopify_instance = queue_line.shopify_instance_id
-            order_data = json.loads(queue_line.order_data)
+            order_data = queue_line.get_payload_ept()
             shopify_status = order_data.get("financial_status")
             order = self.search_existing_shopify_order(order_data, shopify_instance, order_data.get("order_number"))
 
@@ -3,16 +3,29 @@
 
 import json
 import logging
-import time
 from datetime import datetime, timedelta
 
 from odoo import models, fields, api
-from odoo.exceptions import UserError
 from .. import shopify
+from ..shopify.limits import BucketRegistry
 from ..shopify.pyactiveresource.connection import ClientError
 
 _logger = logging.getLogger("Shopify Product")
 
+SHOPIFY_INVENTORY_BATCH_SIZE = 250
+# Sites (with their API version) whose GraphQL API has no inventorySetOnHandQuantities mutation.
+_sites_without_inventory_mutation = set()
+INVENTORY_SET_ON_HAND_MUTATION = """
+mutation inventorySetOnHandQuantities($input: InventorySetOnHandQuantitiesInput!) {
+  inventorySetOnHandQuantities(input: $input) {
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
 
 class ShopifyProductProductEpt(models.Model):
     _name = "shopify.product.product.ept"
@@ -369,10 +382,6 @@ class ShopifyProductProductEpt(models.Model):
             return False
         try:
             new_product = shopify.Product().find(template.shopify_tmpl_id)
-        except ClientError as error:
-            if hasattr(error, "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                new_product = shopify.Product().find(template.shopify_tmpl_id)
         except Exception as error:
             message = "Template %s not found in shopify while updating Product.\nError: %s" % (
                 template.shopify_tmpl_id, str(error))
@@ -595,9 +604,8 @@ class ShopifyProductProductEpt(models.Model):
         try:
             shopify_images = shopify.Image().find(product_id=int(shopify_template.shopify_tmpl_id))
         except ClientError as error:
-            if hasattr(error, "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                shopify_images = shopify.Image().find(product_id=shopify_template.shopify_tmpl_id)
+            _logger.info("Product images not found in Shopify for product ID %s. Error: %s",
+                         shopify_template.shopify_tmpl_id, error)
 
         return shopify_images
 
@@ -617,6 +625,7 @@ class ShopifyProductProductEpt(models.Model):
         common_log_line_obj = self.env["common.log.lines.ept"]
         product_obj = self.env["product.product"]
         sale_order_obj = self.env["sale.order"]
+        stock_export_snapshot_obj = self.env["shopify.stock.export.snapshot.ept"]
 
         log_line_array = []
         model = "shopify.product.product.ept"
@@ -645,6 +654,9 @@ class ShopifyProductProductEpt(models.Model):
             message = "Location not found for instance %s while update stock" % instance.name
             log_line_array = self.shopify_create_log(message, model_id, False, log_line_array)
 
+        # The stock of all the locations is computed at once, one warehouse group per location.
+        stock_by_location = self.check_stock_by_location(instance, shopify_products.product_id.ids, product_obj,
+                                                         location_ids.filtered("export_stock_warehouse_ids"))
         for location_id in location_ids:
             shopify_location_warehouse = location_id.export_stock_warehouse_ids or False
             if not shopify_location_warehouse:
@@ -652,15 +664,9 @@ class ShopifyProductProductEpt(models.Model):
                 log_line_array = self.shopify_create_log(message, model_id, False, log_line_array)
                 continue
 
-            odoo_product_ids = shopify_products.product_id.ids
-            product_stock = self.check_stock(instance, odoo_product_ids, product_obj,
-                                             location_id.export_stock_warehouse_ids)
-            commit_count = 0
+            product_stock = stock_by_location.get(location_id, {})
+            export_stock_data = []
             for shopify_product in shopify_products:
-                if commit_count == 50:
-                    self._cr.commit()
-                    commit_count = 0
-                commit_count += 1
                 odoo_product = shopify_product.product_id
                 if odoo_product.detailed_type == "product":
                     if not shopify_product.inventory_item_id:
@@ -671,32 +677,38 @@ class ShopifyProductProductEpt(models.Model):
                         continue
 
                     quantity = self.compute_qty_for_export_stock(product_stock, shopify_product, odoo_product)
-                    try:
-                        shopify.InventoryLevel.set(location_id.shopify_location_id, shopify_product.inventory_item_id,
-                                                   int(quantity))
-                    except ClientError as error:
-                        if hasattr(error,
-                                   "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                            time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                            shopify.InventoryLevel.set(location_id.shopify_location_id,
-                                                       shopify_product.inventory_item_id,
-                                                       int(quantity))
-                            continue
-                        message = "Error while Export stock for Product ID: %s & Product Name: '%s' for instance:" \
-                                  "'%s'\nError: %s\n%s" % (odoo_product.id, odoo_product.name, instance.name,
-                                                           str(error.response.code) + " " + error.response.msg,
-                                                           json.loads(error.response.body.decode()).get("errors")[0]
-                                                           )
-                        log_line_array = self.shopify_create_log(message, model_id, odoo_product, log_line_array)
-
-                    except Exception as error:
-                        message = "Error while Export stock for Product ID: %s & Product Name: '%s' for instance: " \
-                                  "'%s'\nError: %s" % (odoo_product.id, odoo_product.name, instance.name, str(error))
-                        log_line_array = self.shopify_create_log(message, model_id, odoo_product, log_line_array)
-
-                    if not self._context.get('is_process_from_selected_product'):
-                        shopify_product.write({
-                            'last_stock_update_date': last_export_date if not shopify_product.last_stock_update_date else datetime.now()})
+                    export_stock_data.append((shopify_product, int(quantity)))
+
+            snapshot_scope = {"shopify_instance_id": instance.id, "shopify_location_id": location_id.id}
+            if not self._context.get('is_process_from_selected_product'):
+                # The quantities which are the same as the last exported ones are not sent again.
+                changed_quantities = stock_export_snapshot_obj.get_changed_quantities_ept(
+                    snapshot_scope, {shopify_product.id: quantity for shopify_product, quantity in export_stock_data})
+                unchanged_products = self.browse([stock_data[0].id for stock_data in export_stock_data
+                                                  if stock_data[0].id not in changed_quantities])
+                self.set_last_stock_update_date(unchanged_products, last_export_date)
+                export_stock_data = [stock_data for stock_data in export_stock_data
+                                     if stock_data[0].id in changed_quantities]
+                _logger.info("Exporting stock of %s products in location %s, %s products are unchanged.",
+                             len(export_stock_data), location_id.name, len(unchanged_products))
+
+            for index in range(0, len(export_stock_data), SHOPIFY_INVENTORY_BATCH_SIZE):
+                batch_stock_data = export_stock_data[index:index + SHOPIFY_INVENTORY_BATCH_SIZE]
+                failed_stock_data, exported_stock_data, log_line_array = self.export_stock_batch_using_graphql(
+                    instance, location_id, batch_stock_data, model_id, log_line_array)
+                for shopify_product, quantity in failed_stock_data:
+                    is_exported, log_line_array = self.export_stock_using_rest(instance, location_id,
+                                                                               shopify_product, quantity, model_id,
+                                                                               log_line_array)
+                    if is_exported:
+                        exported_stock_data.append((shopify_product, quantity))
+                stock_export_snapshot_obj.set_exported_quantities_ept(
+                    snapshot_scope, {shopify_product.id: quantity for shopify_product, quantity in exported_stock_data})
+
+                if not self._context.get('is_process_from_selected_product'):
+                    batch_products = self.browse([stock_data[0].id for stock_data in batch_stock_data])
+                    self.set_last_stock_update_date(batch_products, last_export_date)
+                self._cr.commit()
         log_book_id = False
         if len(log_line_array) > 0:
             log_book_id = self.create_log_book(log_line_array, "export", instance)
@@ -716,6 +728,138 @@ class ShopifyProductProductEpt(models.Model):
             sale_order_obj.create_schedule_activity_against_logbook(log_book_id, log_book_id.log_lines, note)
         return all_products
 
+    @api.model
+    def trigger_stock_push_in_shopify(self, company_ids, delay=False):
+        """ This method is used to schedule the stock push cron, when the stock changed in a company having an
+            instance with the push of stock changes. The cron runs after a few seconds, so the changes of this
+            period are exported together.
+            :param company_ids: Ids of companies, whose stock changed.
+            :param delay: Seconds after which the cron runs, by default the shopify_ept.stock_push_delay system
+            parameter (3 seconds).
+        """
+        if not self.env["shopify.instance.ept"].sudo().search_count([("shopify_stock_push", "=", True),
+                                                                     ("shopify_company_id", "in", company_ids)]):
+            return False
+        push_cron = self.env.ref("shopify_ept.ir_cron_shopify_push_stock", False)
+        if not push_cron:
+            return False
+        if not delay:
+            delay = int(self.env["ir.config_parameter"].sudo().get_param("shopify_ept.stock_push_delay", 3))
+        push_cron.sudo()._trigger(at=datetime.now() + timedelta(seconds=delay))
+        return True
+
+    @api.model
+    def push_stock_changes_in_shopify(self):
+        """ This method is used by the stock push cron to export the stock changes of the instances with the push
+            of stock changes. It reads the same stock change journal as the export stock cron, so a change is
+            exported once. When the API limit of a store is reached, its push is postponed until the bucket has
+            leaked instead of waiting for it here.
+        """
+        process_import_export_obj = self.env["shopify.process.import.export"]
+        stock_change_journal_obj = self.env["stock.change.journal.ept"]
+        instances = self.env["shopify.instance.ept"].search([("shopify_stock_push", "=", True)])
+        for instance in instances:
+            instance.connect_in_shopify()
+            delay = BucketRegistry.bucket_for(shopify.ShopifyResource.connection.site).delay()
+            if delay > 1:
+                _logger.info("API limit of the instance %s is reached, stock push is postponed by %s seconds.",
+                             instance.name, delay)
+                self.trigger_stock_push_in_shopify(instance.shopify_company_id.ids, delay=int(delay) + 1)
+                continue
+            process_import_export_obj.update_stock_in_shopify(ctx={"shopify_instance_id": instance.id})
+            retry_delay = stock_change_journal_obj.get_stock_push_retry_delay_ept(
+                "shopify.instance.ept,%s" % instance.id, instance.shopify_company_id,
+                int(self.env["ir.config_parameter"].sudo().get_param("shopify_ept.stock_push_delay", 3)))
+            if retry_delay:
+                self.trigger_stock_push_in_shopify(instance.shopify_company_id.ids, delay=retry_delay)
+            self._cr.commit()
+        return True
+
+    def set_last_stock_update_date(self, shopify_products, last_export_date):
+        """ This method is used to set the last stock update date of the products handled by the stock export.
+            :param last_export_date: Date set on the products, which are exported for the first time.
+        """
+        new_products = shopify_products.filtered(lambda x: not x.last_stock_update_date)
+        new_products.write({'last_stock_update_date': last_export_date})
+        (shopify_products - new_products).write({'last_stock_update_date': datetime.now()})
+        return True
+
+    def export_stock_batch_using_graphql(self, instance, location_id, stock_data, model_id, log_line_array,
+                                         retry_valid_items=True):
+        """ This method is used to set the stock of up to 250 inventory items of a location with one
+            inventorySetOnHandQuantities mutation instead of one InventoryLevel.set call per item.
+            :param stock_data: List of tuple (shopify product, quantity).
+            :param retry_valid_items: Send the items without error again by one more mutation, when Shopify rejects
+            the mutation because of some items.
+            @return: List of (shopify product, quantity) which must be exported by REST, list of (shopify product,
+            quantity) which are exported, log_line_array
+        """
+        site = shopify.ShopifyResource.connection.site
+        if site in _sites_without_inventory_mutation:
+            return stock_data, [], log_line_array
+        set_quantities = [{"inventoryItemId": "gid://shopify/InventoryItem/%s" % shopify_product.inventory_item_id,
+                           "locationId": "gid://shopify/Location/%s" % location_id.shopify_location_id,
+                           "quantity": quantity} for shopify_product, quantity in stock_data]
+        variables = {"input": {"reason": "correction", "setQuantities": set_quantities}}
+        try:
+            result = instance.execute_shopify_graphql(INVENTORY_SET_ON_HAND_MUTATION, variables)
+            user_errors = result["data"]["inventorySetOnHandQuantities"]["userErrors"]
+        except Exception as error:
+            if "inventorySetOnHandQuantities" in str(error) and "doesn't exist" in str(error):
+                _sites_without_inventory_mutation.add(site)
+                _logger.info("API version of the instance %s has no inventorySetOnHandQuantities mutation, stock is "
+                             "exported by REST.", instance.name)
+                return stock_data, [], log_line_array
+            _logger.info("Stock export by GraphQL failed for location %s, exporting by REST. Error: %s",
+                         location_id.name, error)
+            return stock_data, [], log_line_array
+
+        if not user_errors:
+            return [], list(stock_data), log_line_array
+
+        failed_indexes = set()
+        for user_error in user_errors:
+            field = user_error.get("field") or []
+            if len(field) < 3 or field[1] != "setQuantities" or not str(field[2]).isdigit():
+                continue
+            index = int(field[2])
+            if index >= len(stock_data):
+                continue
+            failed_indexes.add(index)
+            odoo_product = stock_data[index][0].product_id
+            message = "Error while Export stock for Product ID: %s & Product Name: '%s' for instance: " \
+                      "'%s'\nError: %s" % (odoo_product.id, odoo_product.name, instance.name,
+                                           user_error.get("message"))
+            log_line_array = self.shopify_create_log(message, model_id, odoo_product, log_line_array)
+
+        # Shopify rejects the whole mutation when any item is invalid, so the other items are sent again by one
+        # more mutation, and by REST only when that one fails as well.
+        valid_stock_data = [data for index, data in enumerate(stock_data) if index not in failed_indexes]
+        if retry_valid_items and failed_indexes and valid_stock_data:
+            return self.export_stock_batch_using_graphql(instance, location_id, valid_stock_data, model_id,
+                                                         log_line_array, retry_valid_items=False)
+        return valid_stock_data, [], log_line_array
+
+    def export_stock_using_rest(self, instance, location_id, shopify_product, quantity, model_id, log_line_array):
+        """ This method is used to set the stock of one inventory item by the InventoryLevel REST API.
+            @return: True if the stock is exported, log_line_array
+        """
+        odoo_product = shopify_product.product_id
+        try:
+            shopify.InventoryLevel.set(location_id.shopify_location_id, shopify_product.inventory_item_id, quantity)
+            return True, log_line_array
+        except ClientError as error:
+            message = "Error while Export stock for Product ID: %s & Product Name: '%s' for instance:" \
+                      "'%s'\nError: %s\n%s" % (odoo_product.id, odoo_product.name, instance.name,
+                                               str(error.response.code) + " " + error.response.msg,
+                                               json.loads(error.response.body.decode()).get("errors")[0])
+            log_line_array = self.shopify_create_log(message, model_id, odoo_product, log_line_array)
+        except Exception as error:
+            message = "Error while Export stock for Product ID: %s & Product Name: '%s' for instance: " \
+                      "'%s'\nError: %s" % (odoo_product.id, odoo_product.name, instance.name, str(error))
+            log_line_array = self.shopify_create_log(message, model_id, odoo_product, log_line_array)
+        return False, log_line_array
+
     def compute_qty_for_export_stock(self, product_stock, shopify_product, odoo_product):
         """ This method is used to find qty base on the configuration of Shopify.
             :param product_stock: Dictionary of the odoo product with qty.
@@ -747,24 +891,20 @@ class ShopifyProductProductEpt(models.Model):
                                         ("product_id", "in", product_ids)], order='last_stock_update_date')
         return shopify_products
 
-    def check_stock(self, instance, product_ids, prod_obj, warehouse):
+    def check_stock_by_location(self, instance, product_ids, prod_obj, location_ids):
         """
-        This Method relocates check type of stock.
-        :param instance: This arguments relocates instance of Shopify.
-        :param product_ids: This arguments product listing id of odoo.
-        :param prod_obj: This argument relocates product object of common connector.
-        :param warehouse:This arguments relocates warehouse of shopify export location.
-        :return: This Method return product listing stock.
+        This Method is used to get the stock of products for several Shopify locations with one query.
+        :param product_ids: Ids of Odoo products.
+        :param prod_obj: Object of product.product.
+        :param location_ids: Records of Shopify location, the stock is computed in their export warehouses.
+        :return: Dictionary of Shopify location and dictionary of product and its stock.
         """
         product_stock = {}
-
-        if product_ids:
-            if instance.shopify_stock_field.name == "free_qty":
-                product_stock = prod_obj.get_free_qty_ept(warehouse, product_ids)
-
-            elif instance.shopify_stock_field.name == "virtual_available":
-                product_stock = prod_obj.get_forecasted_qty_ept(warehouse, product_ids)
-
+        stock_type = instance.shopify_stock_field.name
+        if product_ids and location_ids and stock_type in ("free_qty", "virtual_available"):
+            product_stock = prod_obj.get_qty_by_warehouse_groups_ept(
+                {location_id: location_id.export_stock_warehouse_ids for location_id in location_ids}, product_ids,
+                stock_type)
         return product_stock
 
     def import_shopify_stock(self, instance, validate_inventory):
@@ -786,6 +926,7 @@ class ShopifyProductProductEpt(models.Model):
             location_ids = self.search_shopify_location_for_import_stock(instance, model_id, log_line_array)
             if not location_ids:
                 return False
+            product_by_inventory_item = self.get_product_by_inventory_item(instance)
 
             for location_id in location_ids:
                 shopify_location_warehouse = location_id.import_stock_warehouse_id or False
@@ -795,12 +936,18 @@ class ShopifyProductProductEpt(models.Model):
                     _logger.info(message)
                     continue
 
-                inventory_levels = self.request_for_the_inventory_level(location_id, instance, model_id, log_line_array)
+                inventory_level_pages = self.request_for_the_inventory_level(location_id, instance, model_id,
+                                                                             log_line_array)
 
-                if not inventory_levels:
+                if not inventory_level_pages:
                     continue
 
-                stock_inventory_array = self.prepare_val_for_stock_inventory(inventory_levels, instance)
+                stock_inventory_array = {}
+                for inventory_levels in inventory_level_pages:
+                    page_stock = self.prepare_val_for_stock_inventory(inventory_levels, instance,
+                                                                      product_by_inventory_item)
+                    for product_id, qty in page_stock.items():
+                        stock_inventory_array.setdefault(product_id, qty)
 
                 if len(stock_inventory_array) > 0:
                     inventory_name = 'Inventory For Instance "%s" And Shopify Location "%s"' % (
@@ -836,14 +983,14 @@ class ShopifyProductProductEpt(models.Model):
 
     def request_for_the_inventory_level(self, location_id, instance, model_id, log_line_array):
         """ This method is used to request for inventory level from Odoo to shopify.
+            @return: Iterator of the pages of inventory levels, the next page is requested in background while
+            the current one is processed.
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 21 October 2020 .
             Task_id: 167537
         """
         try:
-            inventory_levels = shopify.InventoryLevel.find(location_ids=location_id.shopify_location_id,
-                                                           limit=250)
-            if len(inventory_levels) == 250:
-                inventory_levels = self.shopify_list_all_inventory_level(inventory_levels)
+            inventory_level_pages = shopify.InventoryLevel.find_pages(location_ids=location_id.shopify_location_id,
+                                                                      limit=250)
         except Exception as error:
             message = "Error while import stock for instance %s\nError: %s" % (
                 instance.name, str(error.response.code) + " " + error.response.msg)
@@ -852,70 +999,45 @@ class ShopifyProductProductEpt(models.Model):
             self.create_log_book(log_line_array, "import", instance)
             return False
 
-        _logger.info("Length of the total inventory item id : %s", len(inventory_levels))
-
-        return inventory_levels
+        return inventory_level_pages
 
-    def prepare_val_for_stock_inventory(self, inventory_levels, instance):
+    def get_product_by_inventory_item(self, instance):
+        """ This method is used to map the inventory items of the exported Shopify products of the instance to their
+            Odoo products with one query, so the inventory levels are not searched one by one.
+            @return: Dictionary of inventory item id and product id.
+        """
+        product_by_inventory_item = {}
+        shopify_products = self.search_read([("shopify_instance_id", "=", instance.id),
+                                             ("exported_in_shopify", "=", True),
+                                             ("inventory_item_id", "!=", False)],
+                                            ["inventory_item_id", "product_id"])
+        for shopify_product in shopify_products:
+            if shopify_product["product_id"]:
+                product_by_inventory_item.setdefault(shopify_product["inventory_item_id"],
+                                                     shopify_product["product_id"][0])
+        return product_by_inventory_item
+
+    def prepare_val_for_stock_inventory(self, inventory_levels, instance, product_by_inventory_item=None):
         """ This method is used to search the shopify product base on the inventory id which receive from the
             inventory level dict.
+            @param product_by_inventory_item: Dictionary of inventory item id and product id, prepared by
+            get_product_by_inventory_item when not given.
             @return: stock_inventory_line
             @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 21 October 2020 .
             Task_id: 167537
             Migration done by Meera Sidapara on 30/09/2021
         """
+        if product_by_inventory_item is None:
+            product_by_inventory_item = self.get_product_by_inventory_item(instance)
         stock_inventory_array = {}
-        product_ids_list = []
         for inventory_level in inventory_levels:
             inventory_level = inventory_level.to_dict()
-            inventory_item_id = inventory_level.get("inventory_item_id")
-            qty = inventory_level.get("available")
-
-            shopify_product = self.env["shopify.product.product.ept"].search(
-                [("inventory_item_id", "=", inventory_item_id), ("exported_in_shopify", "=", True),
-                 ("shopify_instance_id", "=", instance.id)], limit=1)
-            if shopify_product:
-                product_id = shopify_product.product_id
-                if product_id not in product_ids_list:
-                    stock_inventory_line = {
-                        product_id.id: qty,
-                    }
-                    stock_inventory_array.update(stock_inventory_line)
-                    product_ids_list.append(product_id)
+            product_id = product_by_inventory_item.get(str(inventory_level.get("inventory_item_id")))
+            if product_id:
+                stock_inventory_array.setdefault(product_id, inventory_level.get("available"))
 
         return stock_inventory_array
 
-    def shopify_list_all_inventory_level(self, result):
-        """
-            This method used to call the page wise data import for product stock from Shopify to Odoo.
-            @param : self, result
-            @author: Angel Patel @Emipro Technologies Pvt. Ltd on date 21/12/2019.
-            Modify by Haresh Mori on 28/12/2019 API and Pagination changes
-        """
-        sum_inventory_list = []
-        catch = ""
-        while result:
-            page_info = ""
-            sum_inventory_list += result
-            link = shopify.ShopifyResource.connection.response.headers.get("Link")
-            if not link or not isinstance(link, str):
-                return sum_inventory_list
-            for page_link in link.split(","):
-                if page_link.find("next") > 0:
-                    page_info = page_link.split(";")[0].strip("<>").split("page_info=")[1]
-                    try:
-                        result = shopify.InventoryLevel.find(page_info=page_info, limit=250)
-                    except ClientError as error:
-                        if hasattr(error,
-                                   "response") and error.response.code == 429 and error.response.msg == "Too Many Requests":
-                            time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                            result = shopify.InventoryLevel.find(page_info=page_info, limit=250)
-                    except Exception as error:
-                        raise UserError(error)
-            if catch == page_info:
-                break
-        return sum_inventory_list
-
     def shopify_create_log(self, message=False, model_id=False, product=False, log_line_array=False):
         """
         This method is used to prepare a vals for log line.
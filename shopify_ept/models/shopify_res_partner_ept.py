@@ -22,24 +22,14 @@ class ShopifyResPartnerEpt(models.Model):
 
         shopify_instance_id = instance.id
         shopify_customer_id = vals.get("id", False)
-        first_name = vals.get("first_name", "")
-        last_name = vals.get("last_name", "")
         email = vals.get("email", "")
 
-        if not first_name and not last_name and not email:
+        if not vals.get("first_name", "") and not vals.get("last_name", "") and not email:
             message = "First name, Last name and Email are not found in customer data."
             model_id = common_log_line_obj.get_model_id("res.partner")
             common_log_line_obj.shopify_create_customer_log_line(message, model_id, queue_line, log_book)
             return False
 
-        name = ""
-        if first_name:
-            name = "%s" % first_name
-        if last_name:
-            name += " %s" % last_name if name else "%s" % last_name
-        if not name and email:
-            name = email
-
         partner = self.search_shopify_partner(shopify_customer_id, shopify_instance_id)
 
         if partner:
@@ -56,8 +46,31 @@ class ShopifyResPartnerEpt(models.Model):
                 self.create(shopify_partner_values)
                 return partner
 
-        partner_vals = self.shopify_prepare_partner_vals(vals.get("default_address", {}))
+        partner = partner_obj.create(self.shopify_prepare_contact_partner_vals(vals))
 
+        shopify_partner_values.update({"partner_id": partner.id})
+        self.create(shopify_partner_values)
+
+        return partner
+
+    def shopify_prepare_contact_partner_vals(self, vals):
+        """ This method is used to prepare the values of the contact partner of a Shopify customer.
+            @param vals: Dictionary of the customer data.
+            @return: Dictionary of the partner values.
+        """
+        first_name = vals.get("first_name", "")
+        last_name = vals.get("last_name", "")
+        email = vals.get("email", "")
+
+        name = ""
+        if first_name:
+            name = "%s" % first_name
+        if last_name:
+            name += " %s" % last_name if name else "%s" % last_name
+        if not name and email:
+            name = email
+
+        partner_vals = self.shopify_prepare_partner_vals(vals.get("default_address", {}))
         partner_vals.update({
             "name": name,
             "email": email,
@@ -65,12 +78,7 @@ class ShopifyResPartnerEpt(models.Model):
             "is_shopify_customer": True,
             "type": "contact",
         })
-        partner = partner_obj.create(partner_vals)
-
-        shopify_partner_values.update({"partner_id": partner.id})
-        self.create(shopify_partner_values)
-
-        return partner
+        return partner_vals
 
     def search_shopify_partner(self, shopify_customer_id, shopify_instance_id):
         """ This method is used to search the shopify partner.
@@ -79,6 +87,10 @@ class ShopifyResPartnerEpt(models.Model):
             Task_id: 167537
         """
         partner = False
+        customer_index = self._context.get("shopify_customer_index")
+        if customer_index and str(shopify_customer_id) in customer_index:
+            return self.env["res.partner"].browse(customer_index[str(shopify_customer_id)])
+
         shopify_partner = self.search([("shopify_customer_id", "=", shopify_customer_id),
                                        ("shopify_instance_id", "=", shopify_instance_id)], limit=1)
         if shopify_partner:
@@ -5,7 +5,6 @@ import base64
 import hashlib
 import json
 import logging
-import time
 from datetime import datetime
 import requests
 from dateutil import parser
@@ -185,10 +184,6 @@ class ShopifyProductTemplateEpt(models.Model):
             result = [shopify.Product().find(template_id)]
         except ClientError as error:
             if hasattr(error, "response"):
-                if error.response.code == 429 and error.response.msg == "Too Many Requests":
-                    time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                    result = [shopify.Product().find(template_id)]
-                    return result
                 message = "Error while importing product for order. Product ID: %s.\nError: %s\n%s" % (
                     template_id, str(error.response.code) + " " + error.response.msg,
                     json.loads(error.response.body.decode()).get("errors")[0])
@@ -343,8 +338,7 @@ class ShopifyProductTemplateEpt(models.Model):
             remove_dict_result = result.pop()
             template_data = remove_dict_result.to_dict()
         else:
-            template_data = product_data_line_id.synced_product_data
-            template_data = json.loads(template_data)
+            template_data = product_data_line_id.get_payload_ept()
             skip_existing_product = product_data_line_id.product_data_queue_id.skip_existing_product
 
         return template_data, skip_existing_product
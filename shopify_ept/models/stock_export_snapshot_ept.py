@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import models, fields
+
+
+class ShopifyStockExportSnapshotEpt(models.Model):
+    _name = "shopify.stock.export.snapshot.ept"
+    _inherit = "stock.export.snapshot.mixin.ept"
+    _description = "Shopify Last Exported Stock"
+
+    _snapshot_scope_fields = ("shopify_instance_id", "shopify_location_id")
+    _snapshot_product_field = "shopify_product_id"
+
+    shopify_instance_id = fields.Many2one("shopify.instance.ept", "Instance", required=True, ondelete="cascade")
+    shopify_location_id = fields.Many2one("shopify.location.ept", "Location", required=True, ondelete="cascade")
+    shopify_product_id = fields.Many2one("shopify.product.product.ept", "Product", required=True,
+                                         ondelete="cascade")
+
+    _sql_constraints = [("unique_shopify_stock_export_snapshot",
+                         "unique(shopify_instance_id, shopify_location_id, shopify_product_id)",
+                         "The exported stock of a product can be stored only once per location.")]
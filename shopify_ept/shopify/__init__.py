@@ -4,3 +4,4 @@ from .resources import *
 from .limits import Limits
 from .api_version import *
 from .collection import PaginatedIterator
+from .bulk_operation import BulkOperation, BulkOperationError
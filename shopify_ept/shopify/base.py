@@ -2,12 +2,17 @@ from . import pyactiveresource
 from . pyactiveresource.activeresource import ActiveResource, ResourceMeta, formats
 from . import mixins as mixins
 from .. import shopify
+import io
 import threading
+import time
 import sys
 from six.moves import urllib
 import six
 
-from .collection import PaginatedCollection
+from .collection import PaginatedCollection, PaginatedIterator
+from .limits import BucketRegistry, Limits
+from .pool import pool_manager
+from .retry import default_policy
 from . pyactiveresource.collection import Collection
 
 # Store the response from the last request in the connection object
@@ -15,19 +20,54 @@ from . pyactiveresource.collection import Collection
 
 class ShopifyConnection(pyactiveresource.connection.Connection):
     response = None
+    # Send requests over the shared keep-alive pool instead of one urlopen (and handshake) per call.
+    use_pool = True
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+    # Decides which failed calls are sent again (429, 5xx, connection resets) and how long to back off.
+    retry_policy = default_policy
 
     def __init__(self, site, user=None, password=None, timeout=None,
                  format=formats.JSONFormat):
         super(ShopifyConnection, self).__init__(site, user, password, timeout, format)
 
-    def _open(self, *args, **kwargs):
-        self.response = None
-        try:
-            self.response = super(ShopifyConnection, self)._open(*args, **kwargs)
-        except pyactiveresource.connection.ConnectionError as err:
-            self.response = err.response
-            raise
-        return self.response
+    def _open(self, method, path, headers=None, data=None):
+        bucket = BucketRegistry.bucket_for(self.site)
+        attempt = 0
+        while True:
+            self.response = None
+            bucket.acquire()
+            try:
+                self.response = super(ShopifyConnection, self)._open(method, path, headers=headers, data=data)
+            except pyactiveresource.connection.Error as err:
+                self.response = getattr(err, 'response', None)
+                if self.response is not None:
+                    bucket.update(self.response.get(Limits.CREDIT_LIMIT_HEADER_PARAM))
+                policy = self.retry_policy
+                if attempt >= policy.max_retries or not policy.is_retryable(err, method, headers):
+                    raise
+                retry_after = policy.retry_after(err)
+                if policy.is_throttled(err):
+                    # The next acquire() waits until the bucket has leaked.
+                    bucket.throttle(retry_after or policy.backoff(attempt))
+                else:
+                    time.sleep(retry_after or policy.backoff(attempt))
+                self.log.info('Retrying %s %s after error: %s', method, path, err)
+                attempt += 1
+                continue
+            bucket.update(self.response.get(Limits.CREDIT_LIMIT_HEADER_PARAM))
+            return self.response
+
+    def _urlopen(self, request):
+        if not self.use_pool:
+            return super(ShopifyConnection, self)._urlopen(request)
+        response = pool_manager.urlopen(request, timeout=self.timeout)
+        if response.code in self.REDIRECT_CODES:
+            # Let urllib follow the redirect chain as it did before pooling.
+            return super(ShopifyConnection, self)._urlopen(request)
+        if response.code >= 400:
+            raise urllib.error.HTTPError(response.url, response.code, response.msg, response.headers,
+                                         io.BytesIO(response.read()))
+        return response
 
 # Inherit from pyactiveresource's metaclass in order to use ShopifyConnection
 
@@ -211,3 +251,11 @@ class ShopifyResource(ActiveResource, mixins.Countable):
         if isinstance(collection, Collection) and "headers" in collection.metadata:
             return PaginatedCollection(collection, metadata={"resource_class": cls}, **kwargs)
         return collection
+
+    @classmethod
+    def find_pages(cls, prefetch=True, **kwargs):
+        """Lazily iterate over the pages of a find, prefetching the next page in background."""
+        collection = cls.find(**kwargs)
+        if isinstance(collection, PaginatedCollection):
+            return PaginatedIterator(collection, prefetch=prefetch)
+        return iter([collection])
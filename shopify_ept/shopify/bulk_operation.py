@@ -0,0 +1,119 @@
+"""Shopify GraphQL Bulk Operations.
+
+A bulk operation runs a GraphQL query asynchronously on Shopify's side and
+publishes the result as a JSONL file (one object per line). The result is
+downloaded as a stream so that large exports never have to be held in memory.
+
+>>> from shopify import BulkOperation
+>>> for record in BulkOperation().stream('{ orders { edges { node { id } } } }'):
+...     do_something(record)
+"""
+
+import json
+import time
+from six.moves import urllib
+
+from .resources.graphql import GraphQL
+
+RUN_QUERY_MUTATION = """
+mutation bulkOperationRunQuery($query: String!) {
+  bulkOperationRunQuery(query: $query) {
+    bulkOperation {
+      id
+      status
+    }
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
+CURRENT_OPERATION_QUERY = """
+{
+  currentBulkOperation {
+    id
+    status
+    errorCode
+    objectCount
+    url
+  }
+}
+"""
+
+
+class BulkOperationError(Exception):
+    pass
+
+
+class BulkOperation(object):
+    """Submit a bulk query, wait for it and stream its JSONL result.
+
+    Args:
+        poll_interval: seconds between two status polls.
+        timeout: seconds after which waiting for the operation is abandoned.
+        download_timeout: socket timeout in seconds of the result download, it
+            applies to each read so a long download is not cut.
+    """
+
+    FINISHED_STATUSES = ('COMPLETED', 'FAILED', 'CANCELED', 'EXPIRED')
+
+    def __init__(self, poll_interval=5, timeout=3600, version=None, download_timeout=60):
+        self.graphql = GraphQL(version)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.download_timeout = download_timeout
+        self.operation_id = None
+
+    def _execute(self, query, variables=None):
+        result = json.loads(self.graphql.execute(query, variables))
+        if result.get('errors'):
+            raise BulkOperationError('; '.join(error.get('message', '') for error in result['errors']))
+        return result['data']
+
+    def run(self, query):
+        """Submit the query and return the id of the bulk operation."""
+        data = self._execute(RUN_QUERY_MUTATION, {'query': query})['bulkOperationRunQuery']
+        if data.get('userErrors'):
+            raise BulkOperationError('; '.join(error.get('message', '') for error in data['userErrors']))
+        self.operation_id = data['bulkOperation']['id']
+        return self.operation_id
+
+    def wait(self):
+        """Poll the current bulk operation until it is finished and return it."""
+        deadline = time.time() + self.timeout
+        while True:
+            operation = self._execute(CURRENT_OPERATION_QUERY)['currentBulkOperation']
+            if operation is None or (self.operation_id and operation['id'] != self.operation_id):
+                raise BulkOperationError('Bulk operation %s is not the current one' % self.operation_id)
+            if operation['status'] in self.FINISHED_STATUSES:
+                if operation['status'] != 'COMPLETED':
+                    raise BulkOperationError('Bulk operation %s finished with status %s (%s)' % (
+                        operation['id'], operation['status'], operation.get('errorCode')))
+                return operation
+            if time.time() > deadline:
+                raise BulkOperationError('Bulk operation %s did not finish in %s seconds' % (
+                    operation['id'], self.timeout))
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def iter_result(url, timeout=60):
+        """Yield the records of a JSONL result file one by one while downloading it."""
+        if not url:
+            return
+        response = urllib.request.urlopen(url, timeout=timeout)
+        try:
+            for line in response:
+                line = line.strip()
+                if line:
+                    yield json.loads(line.decode('utf-8'))
+        finally:
+            response.close()
+
+    def stream(self, query):
+        """Run the query as a bulk operation and yield the records of its result."""
+        self.run(query)
+        operation = self.wait()
+        for record in self.iter_result(operation.get('url'), self.download_timeout):
+            yield record
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from . pyactiveresource.collection import Collection
 from six.moves.urllib.parse import urlparse, parse_qs
 import cgi
@@ -140,15 +141,26 @@ class PaginatedIterator(object):
     ...         do_something(item)
     ...
     # every page and the page items are iterated
+
+    With prefetch=True the next page is requested on a background thread
+    while the caller processes the current one, so at most two pages are in
+    memory and the network wait overlaps with the processing.
     """
-    def __init__(self, collection):
+    SESSION_ATTRIBUTES = ('site', 'user', 'password', 'timeout', 'format', 'version', 'url')
+
+    def __init__(self, collection, prefetch=False):
         if not isinstance(collection, PaginatedCollection):
             raise TypeError("PaginatedIterator expects a PaginatedCollection instance")
         self.collection = collection
         self.collection._no_iter_next = True
+        self.prefetch = prefetch
 
     def __iter__(self):
         """Iterate over pages, returning one page at a time."""
+        if self.prefetch:
+            for page in self.__iter_prefetch():
+                yield page
+            return
         current_page = self.collection
         while True:
             yield current_page
@@ -156,3 +168,32 @@ class PaginatedIterator(object):
                 current_page = current_page.next_page(no_cache=True)
             except IndexError:
                 return
+
+    def __capture_session(self):
+        """Return the session of the current thread, the connection settings are thread local."""
+        resource_class = self.collection.metadata["resource_class"]
+        session = dict((name, getattr(resource_class, name)) for name in self.SESSION_ATTRIBUTES)
+        session['headers'] = dict(resource_class.headers)
+        return session
+
+    def __activate_session(self, session):
+        local = self.collection.metadata["resource_class"]._threadlocal
+        for name, value in session.items():
+            setattr(local, name, value)
+        local.connection = None
+
+    def __iter_prefetch(self):
+        executor = ThreadPoolExecutor(max_workers=1, initializer=self.__activate_session,
+                                      initargs=(self.__capture_session(),))
+        try:
+            current_page = self.collection
+            while True:
+                future = None
+                if current_page.has_next_page():
+                    future = executor.submit(current_page.next_page, True)
+                yield current_page
+                if future is None:
+                    return
+                current_page = future.result()
+        finally:
+            executor.shutdown(wait=True)
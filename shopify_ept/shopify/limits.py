@@ -1,3 +1,5 @@
+import threading
+import time
 from .. import shopify
 
 
@@ -59,3 +61,97 @@ class Limits(object):
         How many API calls have I made?
         """
         return int(cls.api_credit_limit_param()[0])
+
+
+class LeakyBucket(object):
+    """
+    Client side model of the Shopify REST leaky bucket of one shop.
+
+    Every request takes one slot of the bucket and the bucket leaks
+    limit / 20 slots per second (2/s for the 40 bucket, 4/s for the 80 bucket of
+    Shopify Plus). acquire() blocks the caller until a slot is free, so requests
+    are paced just under the leak rate instead of failing with 429. The estimate
+    is resynchronised from the X-Shopify-Shop-Api-Call-Limit header of each response.
+    """
+    LEAK_SECONDS = 20
+
+    def __init__(self, limit=40, headroom=2):
+        self.limit = limit
+        self.leak_rate = float(limit) / self.LEAK_SECONDS
+        self.headroom = headroom
+        self.used = 0.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _leak(self, now):
+        self.used = max(0.0, self.used - (now - self.updated) * self.leak_rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Wait until one call can be made without overflowing the bucket and reserve it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._leak(now)
+                capacity = max(1, self.limit - self.headroom)
+                if now >= self.paused_until and self.used + 1 <= capacity:
+                    self.used += 1
+                    return
+                wait = max(self.paused_until - now, (self.used + 1 - capacity) / self.leak_rate)
+            time.sleep(wait)
+
+    def delay(self):
+        """
+        Seconds to wait before one call can be made, without reserving it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._leak(now)
+            capacity = max(1, self.limit - self.headroom)
+            return max(0.0, self.paused_until - now, (self.used + 1 - capacity) / self.leak_rate)
+
+    def update(self, header_value):
+        """
+        Synchronise the bucket with the call limit header value, Eg: 32/40.
+        """
+        try:
+            used, limit = [int(value) for value in header_value.split('/')]
+        except (AttributeError, ValueError):
+            return
+        with self._lock:
+            self._leak(time.monotonic())
+            if limit != self.limit:
+                self.limit = limit
+                self.leak_rate = float(limit) / self.LEAK_SECONDS
+            # Calls reserved by other threads may not be counted in the header yet, never lower the estimate.
+            self.used = max(self.used, float(used))
+
+    def throttle(self, retry_after=None):
+        """
+        Mark the bucket as full after a 429 response and hold every caller for retry_after seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.used = float(self.limit)
+            self.updated = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+
+class BucketRegistry(object):
+    """
+    One LeakyBucket per shop, shared by all threads of the process.
+    """
+    _buckets = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def bucket_for(cls, site):
+        with cls._lock:
+            bucket = cls._buckets.get(site)
+            if bucket is None:
+                bucket = cls._buckets[site] = LeakyBucket()
+            return bucket
@@ -0,0 +1,170 @@
+"""Keep-alive HTTP connection pool used by ShopifyConnection.
+
+urllib.request.urlopen opens a new TCP+TLS connection for every request. The
+pool keeps a bounded number of idle http.client connections per shop so that
+consecutive calls (and consecutive queue batches of the same cron run) reuse
+the already negotiated socket.
+"""
+
+import collections
+import http.client
+import socket
+import ssl
+import threading
+import time
+from six.moves import urllib
+
+from .retry import RetryPolicy
+
+
+class PooledResponse(object):
+    """A fully read HTTP response which mimics the urllib response interface.
+
+    The body is read eagerly so that the underlying connection can be handed
+    back to the pool before the caller processes the response.
+    """
+
+    def __init__(self, url, response):
+        self.url = url
+        self.code = response.status
+        self.msg = response.reason
+        self.headers = response.msg
+        self._body = response.read()
+
+    def read(self):
+        return self._body
+
+    def getcode(self):
+        return self.code
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.headers
+
+    def close(self):
+        pass
+
+
+class HostConnectionPool(object):
+    """Idle keep-alive connections towards a single scheme/host/port."""
+
+    def __init__(self, scheme, host, port, maxsize, idle_timeout):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+
+    def _new_connection(self, timeout):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout,
+                                               context=ssl.create_default_context())
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def _evict_stale(self, now):
+        """Close the idle connections unused for longer than idle_timeout.
+
+        The deque is ordered by last use, so the stale connections are at its
+        left end while get() takes the most recent one from the right.
+        Must be called with the lock held.
+        """
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            self._idle.popleft()[0].close()
+
+    def get(self, timeout=None):
+        """Return an idle connection which is still fresh, or a new one."""
+        with self._lock:
+            self._evict_stale(time.monotonic())
+            if self._idle:
+                conn = self._idle.pop()[0]
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._new_connection(timeout), False
+
+    def put(self, conn):
+        """Return a connection to the pool, closing it when the pool is full."""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_stale(now)
+            if len(self._idle) < self.maxsize:
+                self._idle.append((conn, now))
+                return
+        conn.close()
+
+
+class ConnectionPoolManager(object):
+    """Registry of HostConnectionPool objects, one per shop host.
+
+    maxsize bounds the idle connections kept per host; idle_timeout is the
+    number of seconds after which an unused connection is discarded (Shopify
+    closes idle keep-alive sockets on its side after a while as well).
+    """
+
+    def __init__(self, maxsize=4, idle_timeout=60):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def pool_for(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = HostConnectionPool(scheme, host, port, self.maxsize,
+                                                             self.idle_timeout)
+            return pool
+
+    def urlopen(self, request, timeout=None):
+        """Send a urllib Request over a pooled connection.
+
+        Args:
+            request: A urllib.request.Request object.
+            timeout: socket timeout in seconds.
+        Returns:
+            A PooledResponse object.
+        Raises:
+            urllib.error.URLError on IO errors.
+        """
+        url = request.get_full_url()
+        parts = urllib.parse.urlsplit(url)
+        pool = self.pool_for(parts.scheme, parts.hostname, parts.port)
+        headers = dict(request.header_items())
+        headers.setdefault('Connection', 'keep-alive')
+        method = request.get_method()
+        body = request.data
+
+        conn, reused = pool.get(timeout)
+        while True:
+            sent = False
+            try:
+                conn.request(method, request.selector, body=body, headers=headers)
+                sent = True
+                http_response = conn.getresponse()
+                response = PooledResponse(url, http_response)
+            except (http.client.HTTPException, socket.error) as error:
+                conn.close()
+                # A reused socket may have been closed by the server while idle, retry once on a new one.
+                # Once the request is sent, the server may have applied it: only idempotent methods are sent
+                # again, the others are left to the retry policy.
+                if reused and not isinstance(error, socket.timeout) and \
+                        (not sent or RetryPolicy.is_idempotent(method, headers)):
+                    conn, reused = pool._new_connection(timeout), False
+                    continue
+                raise urllib.error.URLError(error)
+            break
+
+        if http_response.will_close:
+            conn.close()
+        else:
+            pool.put(conn)
+        return response
+
+
+pool_manager = ConnectionPoolManager()
@@ -1,12 +1,15 @@
 from ... import shopify
 from ..base import ShopifyResource
-from six.moves import urllib
 import json
 
 class GraphQL():
 
-    def __init__(self):
-        self.endpoint = (shopify.ShopifyResource.get_site() + "/graphql.json")
+    def __init__(self, version=None):
+        site = shopify.ShopifyResource.get_site()
+        if version:
+            # Some mutations only exist in newer versions than the one of the active session.
+            site = site.rsplit('/', 1)[0] + '/' + version
+        self.endpoint = (site + "/graphql.json")
         self.headers = shopify.ShopifyResource.get_headers()
 
     def merge_headers(self, *headers):
@@ -16,18 +19,12 @@ class GraphQL():
         return merged_headers
 
     def execute(self, query, variables=None):
-        endpoint = self.endpoint
-        default_headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        default_headers = {'Accept': 'application/json'}
         headers = self.merge_headers(default_headers, self.headers)
         data = {'query': query,
                 'variables': variables}
 
-        req = urllib.request.Request(self.endpoint, json.dumps(data).encode('utf-8'), headers)
-
-        try:
-            response = urllib.request.urlopen(req)
-            return response.read().decode('utf-8')
-        except urllib.error.HTTPError as e:
-            print((e.read()))
-            print('')
-            raise e
+        # Sent through the resource connection to reuse its authentication, keep-alive pool and retries.
+        response = shopify.ShopifyResource.connection.post(self.endpoint, headers,
+                                                           json.dumps(data).encode('utf-8'))
+        return response.body.decode('utf-8')
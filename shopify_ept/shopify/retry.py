@@ -0,0 +1,69 @@
+"""Retry policy shared by all Shopify REST calls.
+
+ShopifyConnection consults the policy whenever a request fails. Throttled calls
+(429) are always retried after Retry-After because Shopify rejects them before
+doing any work. Server errors (5xx) and network failures (connection reset,
+timeout, ...) are retried only for idempotent calls: GET, HEAD, PUT and DELETE,
+and POST when the caller sends an Idempotency-Key header.
+"""
+
+import random
+
+from .pyactiveresource import connection
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+
+
+class RetryPolicy(object):
+    """Jittered exponential backoff.
+
+    Args:
+        max_retries: number of retries after the first attempt.
+        base_delay: delay in seconds before the first retry.
+        max_delay: upper bound of one backoff delay in seconds.
+    """
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_idempotent(method, headers=None):
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        return bool(headers and headers.get(IDEMPOTENCY_KEY_HEADER))
+
+    @staticmethod
+    def is_throttled(error):
+        return getattr(error, 'code', None) == 429
+
+    def is_retryable(self, error, method, headers=None):
+        """Return True when the failed call may be sent again."""
+        if self.is_throttled(error):
+            return True
+        if not self.is_idempotent(method, headers):
+            return False
+        if isinstance(error, connection.ServerError):
+            return True
+        # Errors raised for a urllib.error.URLError (reset, refused, timeout) carry no HTTP code.
+        return type(error) is connection.Error and error.code is None
+
+    @staticmethod
+    def retry_after(error):
+        """Return the Retry-After header value of the error response in seconds, if any."""
+        response = getattr(error, 'response', None)
+        value = response.get('Retry-After') if response is not None else None
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    def backoff(self, attempt):
+        """Return the delay before retry number attempt (starting from 0)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+
+default_policy = RetryPolicy()
@@ -16,7 +16,7 @@ from odoo.tools.misc import split_every
 
 from odoo import models, fields, api, _
 from .. import shopify
-from ..shopify.pyactiveresource.connection import ClientError
+from ..shopify.pyactiveresource.connection import Error
 
 _logger = logging.getLogger("Shopify Operations")
 
@@ -85,6 +85,10 @@ class ShopifyProcessImportExport(models.TransientModel):
                                                      default="update_date", string="Import Based On")
     is_auto_validate_inventory = fields.Boolean(default=False, string='Auto Validate Inventory',
                                                 help="If you mark it, the inventory will be applied automatically.")
+    shopify_use_bulk_operation = fields.Boolean(string="Use Bulk Operation",
+                                                help="If you mark it, the records are listed by a Shopify bulk "
+                                                     "operation instead of page by page. Recommended for the first "
+                                                     "import and for long periods.")
 
     def shopify_execute(self):
         """This method used to execute the operation as per given in wizard.
@@ -98,7 +102,7 @@ class ShopifyProcessImportExport(models.TransientModel):
         if self.shopify_operation == "sync_product":
             product_queue_ids = product_data_queue_obj.shopify_create_product_data_queue(
                 instance, self.import_products_based_on_date, self.orders_from_date, self.orders_to_date,
-                self.skip_existing_product)
+                self.skip_existing_product, use_bulk_operation=self.shopify_use_bulk_operation)
             if product_queue_ids:
                 queue_ids = product_queue_ids
                 action_name = "shopify_ept.action_shopify_product_data_queue"
@@ -126,19 +130,18 @@ class ShopifyProcessImportExport(models.TransientModel):
                 form_view_name = "shopify_ept.shopify_synced_customer_data_form_view_ept"
 
         elif self.shopify_operation == "import_unshipped_orders":
-            order_queues = order_date_queue_obj.shopify_create_order_data_queues(instance, self.orders_from_date,
-                                                                                 self.orders_to_date,
-                                                                                 order_type="unshipped")
+            order_queues = order_date_queue_obj.shopify_create_order_data_queues(
+                instance, self.orders_from_date, self.orders_to_date, order_type="unshipped",
+                use_bulk_operation=self.shopify_use_bulk_operation)
             if order_queues:
                 queue_ids = order_queues
                 action_name = "shopify_ept.action_shopify_order_data_queue_ept"
                 form_view_name = "shopify_ept.view_shopify_order_data_queue_ept_form"
 
         elif self.shopify_operation == "import_shipped_orders":
-            order_queues = order_date_queue_obj.shopify_create_order_data_queues(instance,
-                                                                                 self.orders_from_date,
-                                                                                 self.orders_to_date,
-                                                                                 order_type="shipped")
+            order_queues = order_date_queue_obj.shopify_create_order_data_queues(
+                instance, self.orders_from_date, self.orders_to_date, order_type="shipped",
+                use_bulk_operation=self.shopify_use_bulk_operation)
             if order_queues:
                 queue_ids = order_queues
                 action_name = "shopify_ept.action_shopify_shipped_order_data_queue_ept"
@@ -292,21 +295,44 @@ class ShopifyProcessImportExport(models.TransientModel):
         customer_queues_ids = []
 
         self.shopify_instance_id.connect_in_shopify()
+        if self.shopify_use_bulk_operation:
+            return self.sync_shopify_customers_by_bulk_operation()
         if not self.shopify_instance_id.shopify_last_date_customer_import:
             customer_ids = shopify.Customer().find(limit=250)
         else:
             customer_ids = shopify.Customer().find(
                 updated_at_min=self.shopify_instance_id.shopify_last_date_customer_import, limit=250)
         if customer_ids:
-            customer_queues_ids = self.create_customer_data_queues(customer_ids)
-            if len(customer_ids) == 250:
-                customer_queues_ids += self.shopify_list_all_customer(customer_ids)
+            customer_queues_ids = self.shopify_list_all_customer(customer_ids)
 
             self.shopify_instance_id.shopify_last_date_customer_import = datetime.now()
         if not customer_ids:
             _logger.info("Customers not found while the import customers from Shopify")
         return customer_queues_ids
 
+    def sync_shopify_customers_by_bulk_operation(self):
+        """
+        This method is used to create customer queues from the customers listed by a bulk operation. The customer
+        ids are received in chunks of 250 and the customers of each chunk are requested by REST.
+        """
+        instance = self.shopify_instance_id
+        customer_queues_ids = []
+        search_query = instance.prepare_shopify_bulk_search_query("updated_at",
+                                                                  instance.shopify_last_date_customer_import, False)
+        import_date = datetime.now()
+        try:
+            for customer_ids in instance.shopify_bulk_operation_id_chunks("customers", search_query):
+                customers = shopify.Customer().find(ids=",".join(customer_ids), limit=250)
+                if customers:
+                    customer_queues_ids += self.create_customer_data_queues(customers)
+        except Exception as error:
+            raise UserError(error)
+        if customer_queues_ids:
+            instance.shopify_last_date_customer_import = import_date
+        else:
+            _logger.info("Customers not found while the import customers from Shopify")
+        return customer_queues_ids
+
     def create_customer_data_queues(self, customer_data):
         """
         It creates customer data queue from data of Customer.
@@ -363,30 +389,15 @@ class ShopifyProcessImportExport(models.TransientModel):
         @author: Angel Patel @Emipro Technologies Pvt. Ltd on date 14/10/2019.
         :Task ID: 157065
         Modify by Haresh Mori on date 26/12/2019, Taken Changes for the pagination and API version.
+        The pages, first one included, are iterated lazily with the next page prefetched in background.
         """
-        catch = ""
         customer_queue_list = []
-        while result:
-            page_info = ""
-            link = shopify.ShopifyResource.connection.response.headers.get('Link')
-            if not link or not isinstance(link, str):
-                return customer_queue_list
-            for page_link in link.split(','):
-                if page_link.find('next') > 0:
-                    page_info = page_link.split(';')[0].strip('<>').split('page_info=')[1]
-                    try:
-                        result = shopify.Customer().find(page_info=page_info, limit=250)
-                    except ClientError as error:
-                        if hasattr(error, "response"):
-                            if error.response.code == 429 and error.response.msg == "Too Many Requests":
-                                time.sleep(int(float(error.response.headers.get('Retry-After', 5))))
-                                result = shopify.Customer().find(page_info=page_info, limit=250)
-                    except Exception as error:
-                        raise UserError(error)
-                    if result:
-                        customer_queue_list += self.create_customer_data_queues(result)
-            if catch == page_info:
-                break
+        try:
+            for customers in shopify.PaginatedIterator(result, prefetch=True):
+                if customers:
+                    customer_queue_list += self.create_customer_data_queues(customers)
+        except Error as error:
+            raise UserError(error)
         return customer_queue_list
 
     @api.model
@@ -410,22 +421,32 @@ class ShopifyProcessImportExport(models.TransientModel):
         if not instance:
             raise UserError(_("Shopify instance not found.\nPlease select one, if you are processing from Operations"
                               " wizard.\nOtherwise please check the code of cron, if it has been modified."))
-        if self.export_stock_from:
-            last_update_date = self.export_stock_from
-            _logger.info("Exporting Stock from Operations wizard for instance - %s", instance.name)
-        else:
-            last_update_date = instance.shopify_last_date_update_stock or datetime.now() - timedelta(30)
-            _logger.info("Exporting Stock by Cron for instance - %s", instance.name)
-
-        products = product_obj.get_products_based_on_movement_date_ept(last_update_date,
-                                                                       instance.shopify_company_id)
-        if products:
-            shopify_products = shopify_product_obj.export_stock_in_shopify(instance, products)
-            if shopify_products:
-                instance.write({'shopify_last_date_update_stock': shopify_products[0].last_stock_update_date})
-        else:
-            instance.shopify_last_date_update_stock = datetime.now()
-            _logger.info("No products found to export stock from %s.....", last_update_date)
+        products = journal_cursor = False
+        journal_consumer = not self.export_stock_from and "shopify.instance.ept,%s" % instance.id
+        with self.env['stock.change.journal.ept'].lock_journal_consumer_ept(journal_consumer) as is_locked:
+            if not is_locked:
+                return True
+            if self.export_stock_from:
+                last_update_date = self.export_stock_from
+                _logger.info("Exporting Stock from Operations wizard for instance - %s", instance.name)
+            else:
+                last_update_date = instance.shopify_last_date_update_stock or datetime.now() - timedelta(30)
+                _logger.info("Exporting Stock by Cron for instance - %s", instance.name)
+                products, journal_cursor = product_obj.get_products_based_on_stock_journal_ept(
+                    journal_consumer, instance.shopify_company_id)
+
+            if products is False:
+                products = product_obj.get_products_based_on_movement_date_ept(last_update_date,
+                                                                               instance.shopify_company_id)
+            if products:
+                shopify_products = shopify_product_obj.export_stock_in_shopify(instance, products)
+                if shopify_products:
+                    instance.write({'shopify_last_date_update_stock': shopify_products[0].last_stock_update_date})
+            else:
+                instance.shopify_last_date_update_stock = datetime.now()
+                _logger.info("No products found to export stock from %s.....", last_update_date)
+            if journal_cursor:
+                self.env['stock.change.journal.ept'].set_journal_cursor_ept(journal_consumer, journal_cursor)
 
         return True
 
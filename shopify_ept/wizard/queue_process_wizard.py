@@ -69,9 +69,11 @@ class ShopifyQueueProcessEpt(models.TransientModel):
         if model == "shopify.order.data.queue.line.ept":
             order_queue_ids = shopify_order_queue_line_obj.search([('id', 'in', order_queue_ids)]).mapped(
                 "shopify_order_data_queue_id").ids
-        self.env.cr.execute(
-            """update shopify_order_data_queue_ept set is_process_queue = False where is_process_queue = True""")
-        self._cr.commit()
+        # Only the selected queues are released, the queues claimed by the cron workers are left alone.
+        if order_queue_ids:
+            self.env.cr.execute("""update shopify_order_data_queue_ept set is_process_queue = False
+                                where is_process_queue = True and id in %s""", (tuple(order_queue_ids),))
+            self._cr.commit()
         for order_queue_id in order_queue_ids:
             order_queue_line_batch = shopify_order_queue_line_obj.search(
                 [("shopify_order_data_queue_id", "=", order_queue_id),
@@ -201,6 +201,8 @@ class ResConfigSettings(models.TransientModel):
                                                  string="Sync Product With", default="sku")
     shopify_pricelist_id = fields.Many2one("product.pricelist", string="Shopify Pricelist")
     shopify_stock_field = fields.Many2one("ir.model.fields", string="Stock Field")
+    shopify_stock_push = fields.Boolean("Push Stock Changes", help="Export the stock of the products a few seconds "
+                                                                   "after it changes, besides the export stock cron.")
     shopify_section_id = fields.Many2one("crm.team", "Shopify Sales Team")
     shopify_is_use_default_sequence = fields.Boolean("Use Odoo Default Sequence in Shopify Orders",
                                                      help="If checked,Then use default sequence of odoo while create "
@@ -285,6 +287,7 @@ class ResConfigSettings(models.TransientModel):
             self.shopify_sync_product_with = instance.shopify_sync_product_with
             self.shopify_pricelist_id = instance.shopify_pricelist_id and instance.shopify_pricelist_id.id or False
             self.shopify_stock_field = instance.shopify_stock_field and instance.shopify_stock_field.id or False
+            self.shopify_stock_push = instance.shopify_stock_push
             self.shopify_section_id = instance.shopify_section_id.id or False
             self.shopify_order_prefix = instance.shopify_order_prefix
             self.shopify_is_use_default_sequence = instance.is_use_default_sequence
@@ -329,6 +332,7 @@ class ResConfigSettings(models.TransientModel):
             values["shopify_sync_product_with"] = self.shopify_sync_product_with
             values["shopify_pricelist_id"] = self.shopify_pricelist_id and self.shopify_pricelist_id.id or False
             values["shopify_stock_field"] = self.shopify_stock_field and self.shopify_stock_field.id or False
+            values["shopify_stock_push"] = self.shopify_stock_push
             values["shopify_section_id"] = self.shopify_section_id and self.shopify_section_id.id or False
             values["shopify_order_prefix"] = self.shopify_order_prefix
             values["is_use_default_sequence"] = self.shopify_is_use_default_sequence
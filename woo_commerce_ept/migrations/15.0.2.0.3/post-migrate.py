@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """ Compress the data of the existing queue lines into their payload. The order and coupon data was stored as
+        the string of a python dictionary, it is converted to JSON on the way. """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["woo.order.data.queue.line.ept"].migrate_payload_column_ept("order_data")
+    env["woo.coupon.data.queue.line.ept"].migrate_payload_column_ept("coupon_data")
+    env["woo.product.data.queue.line.ept"].migrate_payload_column_ept("woo_synced_data")
+    env["woo.customer.data.queue.line.ept"].migrate_payload_column_ept("woo_synced_data")
@@ -34,3 +34,5 @@ from . import coupon_data_queue_ept
 from . import coupon_data_queue_line_ept
 from . import data_queue_mixin_ept
 from . import queue_line_dashboard
+from . import stock_export_snapshot_ept
+from . import stock_change_journal_ept
@@ -12,6 +12,9 @@ class WooCouponDataQueueLineEpt(models.Model):
     _name = "woo.coupon.data.queue.line.ept"
     _description = "WooCommerce Coupon Data Queue Line"
     _rec_name = "number"
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "coupon_data"
+    _payload_strip_keys = ("_links",)
 
     coupon_data_queue_id = fields.Many2one("woo.coupon.data.queue.ept", ondelete="cascade")
     instance_id = fields.Many2one(related="coupon_data_queue_id.woo_instance_id", copy=False,
@@ -20,7 +23,8 @@ class WooCouponDataQueueLineEpt(models.Model):
                              default="draft", copy=False)
     woo_coupon = fields.Char(string="Woo Coupon Id", help="Id of imported coupon.", copy=False)
     coupon_id = fields.Many2one("woo.coupons.ept", copy=False, help="coupon created in Odoo.")
-    coupon_data = fields.Text(help="Data imported from Woocommerce of current coupon.", copy=False)
+    coupon_data = fields.Text(help="Data imported from Woocommerce of current coupon.", copy=False,
+                              compute="_compute_payload_text", inverse="_inverse_payload_text")
     processed_at = fields.Datetime(help="Shows Date and Time, When the data is processed.", copy=False)
     common_log_lines_ids = fields.One2many("common.log.lines.ept", "woo_coupon_data_queue_line_id",
                                            help="Log lines created against which line.", string="Log Message")
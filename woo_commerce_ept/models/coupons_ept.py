@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
-import ast
 import logging
 import requests
 
@@ -259,7 +258,7 @@ class WooCouponEpt(models.Model):
                 self._cr.commit()
                 commit_count = 0
 
-            coupon = ast.literal_eval(queue_line.coupon_data)
+            coupon = queue_line.get_payload_ept()
             if not coupon.get("code"):
                 message = "Coupon code not available in coupon number %s" % coupon.get("id")
                 self.create_woo_coupon_log_lines(message, common_log_book_id, queue_line)
@@ -273,22 +272,15 @@ class WooCouponEpt(models.Model):
             queue_line.coupon_data_queue_id.is_process_queue = False
         return woo_coupons
 
-    def woo_import_all_coupons(self, wc_api, page, common_log_book_id, model_id):
+    def woo_import_all_coupons(self, res, common_log_book_id, model_id):
         """
         this method is used to import the all coupons from woo commerce.
-        :param wc_api:
-        :param page: coupons data page no
+        :param res: Response of a coupons page.
         :param common_log_book_id: common log book id for create a log.
         :param model_id:
         :return:
         @author : Nilesh Parmar on date 17 Dec 2019.
         """
-        try:
-            res = wc_api.get("coupons", params={"per_page": 100, 'page': page})
-        except Exception as error:
-            raise UserError(_("Something went wrong while importing Coupons.\n\nPlease Check your Connection and "
-                              "Instance Configuration.\n\n" + str(error)))
-
         result = self.check_woocommerce_response(res, "Import Coupons", model_id, common_log_book_id)
         if not isinstance(result, list):
             return False
@@ -338,8 +330,8 @@ class WooCouponEpt(models.Model):
         total_pages = res.headers.get('x-wp-totalpages') or 1
 
         if int(total_pages) >= 2:
-            for page in range(2, int(total_pages) + 1):
-                results += self.woo_import_all_coupons(wc_api, page, common_log_book_id, model_id)
+            for page_res in instance.woo_get_pages("coupons", total_pages, {"per_page": 100}, "Coupons"):
+                results += self.woo_import_all_coupons(page_res, common_log_book_id, model_id)
         if not results:
             _logger.info("Coupons data not found from woo")
             return False
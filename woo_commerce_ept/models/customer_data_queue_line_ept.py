@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
 
-import json
 import logging
 import time
 
@@ -16,13 +15,17 @@ class WooCustomerDataQueueLineEpt(models.Model):
     _name = "woo.customer.data.queue.line.ept"
     _description = 'WooCommerce Customer Data Queue Line'
     _rec_name = "woo_synced_data_id"
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "woo_synced_data"
+    _payload_strip_keys = ("_links",)
 
     woo_instance_id = fields.Many2one('woo.instance.ept', string='Instance',
                                       help="Determines that queue line associated with particular instance")
     state = fields.Selection([('draft', 'Draft'), ('failed', 'Failed'), ("cancel", "Cancelled"), ('done', 'Done')],
                              default='draft')
     last_process_date = fields.Datetime(readonly=True)
-    woo_synced_data = fields.Char(string='WooCommerce Synced Data')
+    woo_synced_data = fields.Char(string='WooCommerce Synced Data', compute="_compute_payload_text",
+                                  inverse="_inverse_payload_text")
     woo_synced_data_id = fields.Char(string='Woo Customer Id')
     queue_id = fields.Many2one('woo.customer.data.queue.ept')
     common_log_lines_ids = fields.One2many("common.log.lines.ept", "woo_customer_data_queue_line_id",
@@ -50,7 +53,7 @@ class WooCustomerDataQueueLineEpt(models.Model):
                 self._cr.commit()
                 commit_count = 0
             instance = customer_queue_line.woo_instance_id
-            customer_val = json.loads(customer_queue_line.woo_synced_data)
+            customer_val = customer_queue_line.get_payload_ept()
             _logger.info("Start processing Woo customer Id %s for instance %s.", customer_val.get('id', False),
                          instance.name)
 
@@ -2,6 +2,7 @@
 # See LICENSE file for full copyright and licensing details.
 import logging
 import json
+import threading
 from calendar import monthrange
 from datetime import date, datetime, timedelta
 import requests
@@ -15,6 +16,10 @@ from ..wordpress_xmlrpc import base, media
 from ..wordpress_xmlrpc.exceptions import InvalidCredentialsError
 
 _logger = logging.getLogger("WooCommerce")
+
+# API clients by instance, they keep their pooled connections between the calls and the cron runs.
+_woo_api_cache = {}
+_woo_api_cache_lock = threading.Lock()
 _secondsConverter = {
     'days': lambda interval: interval * 24 * 60 * 60,
     'hours': lambda interval: interval * 60 * 60,
@@ -200,6 +205,8 @@ class WooInstanceEpt(models.Model):
     woo_stock_auto_export = fields.Boolean(string="Woo Stock Auto Update",
                                            help="Check if you want to automatically update stock levels from Odoo to "
                                                 "WooCommerce.")
+    woo_stock_push = fields.Boolean("Push Stock Changes", help="Export the stock of the products a few seconds after "
+                                                               "it changes, besides the stock auto update cron.")
     auto_import_order = fields.Boolean("Auto Import Order from Woo?", help="Imports orders at certain interval.")
     auto_import_complete_order = fields.Boolean("Auto Import Complete Order from Woo?",
                                                 help="Imports complete orders at certain interval.")
@@ -978,10 +985,47 @@ class WooInstanceEpt(models.Model):
         host = self.woo_host
         consumer_key = self.woo_consumer_key
         consumer_secret = self.woo_consumer_secret
-        wc_api = woocommerce.api.API(url=host, consumer_key=consumer_key, consumer_secret=consumer_secret,
-                                     verify_ssl=self.woo_verify_ssl, version=self.woo_version, query_string_auth=True)
+        # The client is shared while the connection details do not change, a change creates a new one.
+        cache_key = (self._cr.dbname, self.id, host, consumer_key, consumer_secret, self.woo_verify_ssl,
+                     self.woo_version)
+        with _woo_api_cache_lock:
+            wc_api = _woo_api_cache.get(cache_key)
+            if wc_api:
+                return wc_api
+            for old_key in [key for key in _woo_api_cache if key[:2] == cache_key[:2]]:
+                _woo_api_cache.pop(old_key).close()
+
+            ir_config_parameter_obj = self.env["ir.config_parameter"].sudo()
+            pool_size = int(ir_config_parameter_obj.get_param("woo_commerce_ept.api_pool_size", 10))
+            timeout = int(ir_config_parameter_obj.get_param("woo_commerce_ept.api_timeout", 60))
+            concurrency = int(ir_config_parameter_obj.get_param("woo_commerce_ept.api_concurrency", 3))
+            wc_api = woocommerce.api.API(url=host, consumer_key=consumer_key, consumer_secret=consumer_secret,
+                                         verify_ssl=self.woo_verify_ssl, version=self.woo_version,
+                                         query_string_auth=True, timeout=timeout, pool_maxsize=pool_size,
+                                         max_workers=concurrency)
+            _woo_api_cache[cache_key] = wc_api
         return wc_api
 
+    def woo_get_pages(self, endpoint, total_pages, params, import_name):
+        """
+        This method is used to iterate the responses of the pages 2..total_pages of a list endpoint, the pages are
+        fetched in parallel by wc_api.get_pages. An error of a page is raised as UserError when the page is reached.
+        @param endpoint: Endpoint of the list, like "orders".
+        @param total_pages: Total pages given by the first response.
+        @param params: Parameters to pass in API.
+        @param import_name: Name of the imported data for the error message, like "Orders".
+        """
+        pages = self.woo_connect().get_pages(endpoint, 2, int(total_pages), params=params)
+        while True:
+            try:
+                response = next(pages)
+            except StopIteration:
+                return
+            except Exception as error:
+                raise UserError(_("Something went wrong while importing %s.\n\nPlease Check your Connection and "
+                                  "Instance Configuration.\n\n%s") % (import_name, str(error)))
+            yield response
+
     def confirm(self):
         """
         Performs needed operations for instance after its creation.
@@ -31,6 +31,8 @@ class WooOrderDataQueueEpt(models.Model):
     created_by = fields.Selection([("import", "By Import Process"), ("webhook", "By Webhook")],
                                   help="Identify the process that generated a queue.", default="import")
     is_process_queue = fields.Boolean('Is Processing Queue', default=False)
+    process_heartbeat = fields.Datetime(copy=False, readonly=True,
+                                        help="Last time the worker processing the queue reported it is alive.")
     running_status = fields.Char(default="Running...")
     queue_process_count = fields.Integer(string="Queue Process Times",
                                          help="it is used know queue how many time processed")
@@ -19,6 +19,9 @@ class WooOrderDataQueueLineEpt(models.Model):
     _name = "woo.order.data.queue.line.ept"
     _description = "WooCommerce Order Data Queue Line"
     _rec_name = "number"
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "order_data"
+    _payload_strip_keys = ("_links",)
 
     order_data_queue_id = fields.Many2one("woo.order.data.queue.ept", ondelete="cascade")
     instance_id = fields.Many2one(related="order_data_queue_id.instance_id", copy=False,
@@ -28,7 +31,8 @@ class WooOrderDataQueueLineEpt(models.Model):
     woo_order = fields.Char(help="Id of imported order.", copy=False)
     sale_order_id = fields.Many2one("sale.order", copy=False,
                                     help="Order created in Odoo.")
-    order_data = fields.Text(help="Data imported from Woocommerce of current order.", copy=False)
+    order_data = fields.Text(help="Data imported from Woocommerce of current order.", copy=False,
+                             compute="_compute_payload_text", inverse="_inverse_payload_text")
     processed_at = fields.Datetime(help="Shows Date and Time, When the data is processed.", copy=False)
     common_log_lines_ids = fields.One2many("common.log.lines.ept", "woo_order_data_queue_line_id",
                                            help="Log lines created against which line.", string="Log Message")
@@ -60,11 +64,9 @@ class WooOrderDataQueueLineEpt(models.Model):
         """
         order_queue_ids = []
         woo_order_data_queue_obj = self.env["woo.order.data.queue.ept"]
+        data_queue_mixin_obj = self.env["data.queue.mixin.ept"]
         start = time.time()
 
-        self.env.cr.execute(
-            """update woo_order_data_queue_ept set is_process_queue = False where is_process_queue = True""")
-        self._cr.commit()
         query = """select queue.id from woo_order_data_queue_line_ept as queue_line
                 inner join woo_order_data_queue_ept as queue on queue_line.order_data_queue_id = queue.id
                 where queue_line.state='draft' and queue.is_action_require = 'False'
@@ -72,18 +74,23 @@ class WooOrderDataQueueLineEpt(models.Model):
         self._cr.execute(query)
         order_queue_list = self._cr.fetchall()
         for result in order_queue_list:
-            order_queue_ids.append(result[0])
+            if result[0] not in order_queue_ids:
+                order_queue_ids.append(result[0])
 
         if order_queue_ids:
-            order_queues = woo_order_data_queue_obj.browse(list(set(order_queue_ids)))
+            order_queues = woo_order_data_queue_obj.browse(order_queue_ids)
 
             order_queue_process_cron_time = order_queues.instance_id.get_woo_cron_execution_time(
                 "woo_commerce_ept.process_woo_order_data_queue")
             for order_queue_id in order_queues:
+                # Skip the queues which are being processed by another cron worker.
+                if not data_queue_mixin_obj.claim_data_queue_ept("woo_order_data_queue_ept", order_queue_id.id,
+                                                                 order_queue_process_cron_time):
+                    continue
                 order_queue_lines = order_queue_id.order_data_queue_line_ids.filtered(lambda x: x.state == "draft")
                 order_queue_id.queue_process_count += 1
                 if order_queue_id.queue_process_count > 3:
-                    order_queue_id.is_action_require = True
+                    order_queue_id.write({"is_action_require": True, "is_process_queue": False})
                     note = "<p>Attention %s queue is processed 3 times you need to process it manually.</p>" % (
                         order_queue_id.name)
                     order_queue_id.message_post(body=note)
@@ -94,6 +101,7 @@ class WooOrderDataQueueLineEpt(models.Model):
                 self._cr.commit()
                 if order_queue_lines:
                     order_queue_lines.process_order_queue_line()
+                order_queue_id.is_process_queue = False
                 if time.time() - start > order_queue_process_cron_time - 60:
                     break
         return True
@@ -137,16 +137,12 @@ class WooProductCategoryEpt(models.Model):
             woo_categ = self.create_or_update_woo_category(category, sync_images_with_product, instance)
         return woo_categ
 
-    def import_all_woo_categories(self, wc_api, page, woo_common_log_id, model_id):
+    def import_all_woo_categories(self, res, woo_common_log_id, model_id):
         """
         This method imports all categories, when multiple pages data is there.
+        @param res: Response of a categories page.
         Migrated by Maulik Barad on Date 07-Oct-2021.
         """
-        try:
-            res = wc_api.get("products/categories", params={'per_page': 100, 'page': page})
-        except Exception as error:
-            raise UserError(_("Something went wrong while importing Categories.\n\nPlease Check your Connection and"
-                              "Instance Configuration.\n\n" + str(error)))
         response = self.check_woocommerce_response(res, "Import Category", model_id, woo_common_log_id)
         if not isinstance(response, list):
             return []
@@ -232,8 +228,9 @@ class WooProductCategoryEpt(models.Model):
         else:
             results = data
         if int(total_pages) >= 2:
-            for page in range(2, int(total_pages) + 1):
-                results += self.import_all_woo_categories(wc_api, page, woo_common_log_id, model_id)
+            for page_res in instance.woo_get_pages("products/categories", total_pages, {'per_page': 100},
+                                                   "Categories"):
+                results += self.import_all_woo_categories(page_res, woo_common_log_id, model_id)
 
         processed_categs = []
         for res in results:
@@ -2,7 +2,6 @@
 # See LICENSE file for full copyright and licensing details.
 import logging
 import time
-import json
 
 from odoo import models, fields
 
@@ -12,6 +11,9 @@ _logger = logging.getLogger("WooCommerce")
 class WooProductDataQueueLineEpt(models.Model):
     _name = "woo.product.data.queue.line.ept"
     _description = 'WooCommerce Product Data Queue Line'
+    _inherit = "queue.line.payload.mixin.ept"
+    _payload_text_field = "woo_synced_data"
+    _payload_strip_keys = ("_links",)
 
     woo_instance_id = fields.Many2one('woo.instance.ept', string='Instance')
     state = fields.Selection([('draft', 'Draft'), ('failed', 'Failed'),
@@ -19,7 +21,8 @@ class WooProductDataQueueLineEpt(models.Model):
                              default='draft')
     synced_date = fields.Datetime(readonly=True)
     last_process_date = fields.Datetime(readonly=True)
-    woo_synced_data = fields.Char(string='WooCommerce Synced Data')
+    woo_synced_data = fields.Char(string='WooCommerce Synced Data', compute="_compute_payload_text",
+                                  inverse="_inverse_payload_text")
     woo_synced_data_id = fields.Char(string='Data Id')
     queue_id = fields.Many2one('woo.product.data.queue.ept', ondelete="cascade")
     common_log_lines_ids = fields.One2many("common.log.lines.ept", "woo_product_queue_line_id",
@@ -132,7 +135,7 @@ class WooProductDataQueueLineEpt(models.Model):
                                                    limit=1)
             if not woo_template:
                 continue
-            product_data = json.loads(browsable_queue_line.woo_synced_data)
+            product_data = browsable_queue_line.get_payload_ept()
             woo_products = woo_template.woo_product_ids
             if woo_template.woo_product_type in ['simple', 'bundle']:
                 woo_template_obj.update_product_images(product_data["images"], {}, woo_template, woo_products[0],
@@ -294,27 +294,112 @@ class WooProductTemplateEpt(models.Model):
         model_id = common_log_line_obj.get_model_id("woo.product.product.ept")
 
         wc_api = instance.woo_connect()
-        _logger.info('Starting Process of Simple Product Export Stock.')
+        _logger.info('Starting Process of Variable Product Export Stock.')
+        batches, template_by_variation = self.plan_variable_stock_export_batches(woo_variable_products,
+                                                                                 product_stock, instance)
+        woo_product_by_woo_id = {variant.variant_id: variant.id for variant in woo_variable_products.woo_product_ids}
+
+        # The batches of all the templates are sent in parallel over the pooled connections of the instance.
+        sent_requests = 0
+        for _endpoint, data, res, error in wc_api.post_batches(batches):
+            sent_requests += 1
+            template = self.browse(template_by_variation[data['update'][0]['id']])
+            if error:
+                message = "Something went wrong while Exporting Stock of %s.\n%s" % (template.name, error)
+                log_lines.append(common_log_line_obj.woo_product_export_log_line(message, model_id).id)
+                continue
+            _logger.info('Completed Variations Batch Stock Update Process of %s with [status: %s]', template.name,
+                         res.status_code)
+            log_line = self.check_woocommerce_response(res, "Update Product stock", model_id)
+            if log_line and not isinstance(log_line, (dict, list)):
+                log_lines.append(log_line.id)
+            elif isinstance(log_line, dict):
+                self.set_exported_stock_data(instance, data['update'], log_line, woo_product_by_woo_id)
+                log_lines += self.prepare_batch_error_log_lines(log_line, template.name, model_id)
+
+        _logger.info('Process of Variable Product Export Stock is completed, stock of %s variations is sent in %s '
+                     'requests.', len(template_by_variation), sent_requests)
+        return log_lines
+
+    def plan_variable_stock_export_batches(self, woo_variable_products, product_stock, instance=False):
+        """
+        This method is used to prepare the batch requests for exporting the stock of variations. Woocommerce
+        accepts 100 records per batch request and the variations can only be updated by the variations endpoint
+        of their parent, the products endpoint refuses the ids of variations.
+        @param woo_variable_products: Records of variable Woo templates.
+        @param product_stock: Stock data of products.
+        @param instance: Record of instance, the variations with unchanged stock are skipped when it is given.
+        @return: List of (endpoint, data) batches, dictionary of variation id and template id.
+        """
+        batches = []
+        template_by_variation = {}
+        variations_by_template = {}
         for template in woo_variable_products:
             variations = self.prepare_variable_batch_export_stock_data(template, product_stock)
+            template_by_variation.update({variation['id']: template.id for variation in variations})
+            variations_by_template[template] = variations
+        if instance:
+            woo_product_by_woo_id = {variant.variant_id: variant.id for variant in
+                                     woo_variable_products.woo_product_ids}
+            all_variations = [variation for variations in variations_by_template.values() for variation in variations]
+            changed_variations = self.filter_changed_stock_data(instance, all_variations, woo_product_by_woo_id)
+            changed_ids = {variation['id'] for variation in changed_variations}
+            template_by_variation = {variation_id: template_id for variation_id, template_id in
+                                     template_by_variation.items() if variation_id in changed_ids}
+        for template, variations in variations_by_template.items():
+            variations = [variation for variation in variations if variation['id'] in template_by_variation]
             if variations:
-                variant_batches = self.prepare_batches(variations)
-                for woo_variants in variant_batches:
-                    _logger.info('Starting Variations Batch Stock Update Process of %s.', template.name)
-                    try:
-                        res = wc_api.post('products/%s/variations/batch' % template.woo_tmpl_id,
-                                          {'update': woo_variants})
-                    except Exception as error:
-                        raise UserError(_("Something went wrong while Exporting Stock.\n\nPlease Check your Connection "
-                                          "and Instance Configuration.\n\n" + str(error)))
-
-                    _logger.info('Completed Variations Batch Stock Update Process Completed with [status: %s]',
-                                 res.status_code)
-                    log_line = self.check_woocommerce_response(res, "Update Product stock", model_id)
-                    if log_line and not isinstance(log_line, (dict, list)):
-                        log_lines.append(log_line.id)
-
-        _logger.info('Process of Variable Product Export Stock is completed.')
+                batches += [('products/%s/variations/batch' % template.woo_tmpl_id, {'update': woo_variants})
+                            for woo_variants in self.prepare_batches(variations)]
+        return batches, template_by_variation
+
+    def filter_changed_stock_data(self, instance, stock_data, woo_product_by_woo_id):
+        """
+        This method is used to remove the products from the stock data, which quantity is the same as the last
+        exported one. Nothing is removed, when the stock is exported for the selected products.
+        @param stock_data: List of dictionary with Woo id and stock_quantity.
+        @param woo_product_by_woo_id: Dictionary of Woo id and id of the Woo product.
+        @return: Stock data to export.
+        """
+        if self._context.get('is_process_from_selected_product') or not stock_data:
+            return stock_data
+        quantities = {woo_product_by_woo_id[str(item['id'])]: item['stock_quantity'] for item in stock_data}
+        changed_quantities = self.env["woo.stock.export.snapshot.ept"].get_changed_quantities_ept(
+            {"woo_instance_id": instance.id}, quantities)
+        _logger.info("Stock of %s products is changed since the last export, %s products are unchanged.",
+                     len(changed_quantities), len(quantities) - len(changed_quantities))
+        return [item for item in stock_data if woo_product_by_woo_id[str(item['id'])] in changed_quantities]
+
+    def set_exported_stock_data(self, instance, stock_data, response, woo_product_by_woo_id):
+        """
+        This method is used to remember the quantities of a batch, which are accepted by WooCommerce.
+        @param stock_data: List of dictionary with Woo id and stock_quantity sent in the batch.
+        @param response: Data of the batch response.
+        @param woo_product_by_woo_id: Dictionary of Woo id and id of the Woo product.
+        @return: Woo ids of the rejected records.
+        """
+        rejected_ids = {str(record.get("id")) for record in response.get("update", []) if
+                        isinstance(record, dict) and record.get("error")}
+        quantities = {woo_product_by_woo_id[str(item['id'])]: item['stock_quantity'] for item in stock_data if
+                      str(item['id']) not in rejected_ids}
+        self.env["woo.stock.export.snapshot.ept"].set_exported_quantities_ept({"woo_instance_id": instance.id},
+                                                                              quantities)
+        return rejected_ids
+
+    def prepare_batch_error_log_lines(self, response, name, model_id):
+        """
+        This method creates log lines for the records of a batch response, which are rejected by WooCommerce.
+        @param response: Data of the batch response.
+        @param name: Name of the exported records, used in the message.
+        @return: Ids of the log lines.
+        """
+        common_log_line_obj = self.env["common.log.lines.ept"]
+        log_lines = []
+        for record in response.get("update", []):
+            if isinstance(record, dict) and record.get("error"):
+                message = "Update stock of %s, Woo Id %s:\n%s" % (name, record.get("id"),
+                                                                   record.get("error").get("message"))
+                log_lines.append(common_log_line_obj.woo_product_export_log_line(message, model_id).id)
         return log_lines
 
     def check_woocommerce_response(self, response, process, model_id, common_log_book=False, product_template=False):
@@ -385,30 +470,33 @@ class WooProductTemplateEpt(models.Model):
 
         wc_api = instance.woo_connect()
         _logger.info('Starting Process of Simple Product Export Stock.')
-        batches = self.prepare_batches(woo_simple_products)
+        woo_product_by_woo_id = {template.woo_tmpl_id: template.woo_product_ids[:1].id for template in
+                                 woo_simple_products}
+        stock_data = self.prepare_simple_batch_export_stock_data(woo_simple_products, product_stock)
+        stock_data = self.filter_changed_stock_data(instance, stock_data, woo_product_by_woo_id)
+        batches = [('products/batch', {'update': batch_update_data}) for batch_update_data in
+                   self.prepare_batches(stock_data)] if stock_data else []
         log_lines = []
-        for woo_products in batches:
-            batch_update_data = self.prepare_simple_batch_export_stock_data(woo_products, product_stock)
-
-            if batch_update_data:
-                _logger.info('Starting Batch Products Stock Update Process.')
-                try:
-                    res = wc_api.post('products/batch', {'update': batch_update_data})
-                except Exception as error:
-                    raise UserError(_("Something went wrong while Exporting Stock.\n\nPlease Check your Connection and "
-                                      "Instance Configuration.\n\n" + str(error)))
-                _logger.info('Completed Product Batch Stock Update Process Completed with [Status: %s]',
-                             res.status_code)
-                log_line = self.check_woocommerce_response(res, "Update Product Stock", model_id)
-                response = {}
-                if isinstance(log_line, (dict, list)):
-                    response = log_line
-                elif log_line:
-                    log_lines.append(log_line.id)
-
-                if response.get('data') and response.get('data', {}).get('status') != 200:
-                    log_line = common_log_line_obj.create({'model_id': model_id, 'message': response.get('message')})
-                    log_lines.append(log_line.id)
+        for _endpoint, data, res, error in wc_api.post_batches(batches):
+            if error:
+                message = "Something went wrong while Exporting Stock.\n%s" % error
+                log_lines.append(common_log_line_obj.woo_product_export_log_line(message, model_id).id)
+                continue
+            _logger.info('Completed Product Batch Stock Update Process Completed with [Status: %s]',
+                         res.status_code)
+            log_line = self.check_woocommerce_response(res, "Update Product Stock", model_id)
+            response = {}
+            if isinstance(log_line, (dict, list)):
+                response = log_line
+            elif log_line:
+                log_lines.append(log_line.id)
+
+            if response.get('data') and response.get('data', {}).get('status') != 200:
+                log_line = common_log_line_obj.create({'model_id': model_id, 'message': response.get('message')})
+                log_lines.append(log_line.id)
+            elif isinstance(response, dict):
+                self.set_exported_stock_data(instance, data['update'], response, woo_product_by_woo_id)
+                log_lines += self.prepare_batch_error_log_lines(response, "Simple Products", model_id)
         _logger.info('Process of Simple Product Export Stock is completed.')
         return log_lines
 
@@ -688,23 +776,15 @@ class WooProductTemplateEpt(models.Model):
             self.sync_woo_attribute_term(instance, woo_common_log_id)
         return True
 
-    def import_all_woo_products(self, instance, common_log_id, page):
+    def import_all_woo_products(self, common_log_id, res):
         """
-        :param instance: It contain the browsable object of class woo_instance_ept
         :param common_log_id: It contain the new log detail and its type is object
-        :param page: It contain the products page number of woo commerce and its type is Integer
+        :param res: Response of a products page
         @author: Dipak Gogiya @Emipro Technologies Pvt. Ltd.
         Migrated Maulik Barad on Date 07-Oct-2021.
         """
         common_log_line_obj = self.env["common.log.lines.ept"]
         model_id = common_log_line_obj.get_model_id('woo.product.template.ept')
-        wc_api = instance.woo_connect()
-        try:
-            res = wc_api.get('products', params={'per_page': 100, 'page': page})
-        except Exception as error:
-            raise UserError(_("Something went wrong while importing Products.\n\nPlease Check your Connection and"
-                              "Instance Configuration.\n\n" + str(error)))
-
         response = self.check_woocommerce_response(res, "Import Product", model_id, common_log_id)
         if not isinstance(response, list):
             return []
@@ -752,8 +832,8 @@ class WooProductTemplateEpt(models.Model):
             if int(total_pages) >= 2:
                 product_queues += self.create_woo_product_queue(results, instance, common_log_id, import_all,
                                                                 template_id)
-                for page in range(2, int(total_pages) + 1):
-                    results = self.import_all_woo_products(instance, common_log_id, page)
+                for page_res in instance.woo_get_pages('products', total_pages, {'per_page': 100}, "Products"):
+                    results = self.import_all_woo_products(common_log_id, page_res)
                     if results:
                         product_queues += self.create_woo_product_queue(results, instance, common_log_id, import_all,
                                                                         template_id)
@@ -1513,7 +1593,7 @@ class WooProductTemplateEpt(models.Model):
             product_queue_id = product_data_queue_line.queue_id.id
             if product_data_queue_line.queue_id.created_by == "webhook":
                 sync_category_and_tags = True
-            data = json.loads(product_data_queue_line.woo_synced_data)
+            data = product_data_queue_line.get_payload_ept()
         return data, product_queue_id, product_data_queue_line, sync_category_and_tags
 
     def prepare_template_vals(self, woo_instance, product_response):
@@ -1996,14 +2076,61 @@ class WooProductTemplateEpt(models.Model):
         woo_instance_id = ctx.get('woo_instance_id', False)
         instance = self.woo_instance_id.browse(woo_instance_id)
         if instance:
-            self.update_stock(instance, instance.last_inventory_update_time)
+            self.update_stock(instance, instance.last_inventory_update_time, use_stock_journal=True)
+
+        return True
+
+    @api.model
+    def trigger_stock_push_in_woo(self, company_ids, delay=False):
+        """
+        This method is used to schedule the stock push cron, when the stock changed in a company having an instance
+        with the push of stock changes. The cron runs after a few seconds, so the changes of this period are
+        exported together.
+        @param company_ids: Ids of companies, whose stock changed.
+        @param delay: Seconds after which the cron runs, by default the woo_commerce_ept.stock_push_delay system
+        parameter (3 seconds).
+        """
+        if not self.env["woo.instance.ept"].sudo().search_count([("woo_stock_push", "=", True),
+                                                                 ("company_id", "in", company_ids)]):
+            return False
+        push_cron = self.env.ref("woo_commerce_ept.ir_cron_woo_push_stock", False)
+        if not push_cron:
+            return False
+        if not delay:
+            delay = int(self.env["ir.config_parameter"].sudo().get_param("woo_commerce_ept.stock_push_delay", 3))
+        push_cron.sudo()._trigger(at=datetime.now() + timedelta(seconds=delay))
+        return True
 
+    @api.model
+    def push_stock_changes_in_woo(self):
+        """
+        This method is used by the stock push cron to export the stock changes of the instances with the push of
+        stock changes. It reads the same stock change journal as the export stock cron, so a change is exported
+        once. When a store answered with 429, its push is postponed until the store accepts calls again.
+        """
+        stock_change_journal_obj = self.env["stock.change.journal.ept"]
+        instances = self.env["woo.instance.ept"].search([("woo_stock_push", "=", True)])
+        for instance in instances:
+            delay = instance.woo_connect().throttle_delay()
+            if delay > 1:
+                _logger.info("Instance %s is throttled, stock push is postponed by %s seconds.", instance.name, delay)
+                self.trigger_stock_push_in_woo(instance.company_id.ids, delay=int(delay) + 1)
+                continue
+            self.update_stock(instance, instance.last_inventory_update_time, use_stock_journal=True)
+            retry_delay = stock_change_journal_obj.get_stock_push_retry_delay_ept(
+                "woo.instance.ept,%s" % instance.id, instance.company_id,
+                int(self.env["ir.config_parameter"].sudo().get_param("woo_commerce_ept.stock_push_delay", 3)))
+            if retry_delay:
+                self.trigger_stock_push_in_woo(instance.company_id.ids, delay=retry_delay)
+            self._cr.commit()
         return True
 
-    def update_stock(self, instance, export_stock_from_date):
+    def update_stock(self, instance, export_stock_from_date, use_stock_journal=False):
         """
         This method is used for export stock from Odoo to WooCommerce according to stock move.
         @parameter : self, instance, export_stock_from_date
+        @param use_stock_journal: True to find the changed products from the stock change journal, the moves are
+        scanned from export_stock_from_date only for the first export.
         @author: Pragnadeep Pitroda @Emipro Technologies Pvt. Ltd on date 16-11-2019.
         :Task id: 156886
         Migrated Maulik Barad on Date 07-Oct-2021.
@@ -2011,19 +2138,31 @@ class WooProductTemplateEpt(models.Model):
         product_obj = self.env['product.product']
         woo_product_product_obj = self.env['woo.product.product.ept']
 
-        if not export_stock_from_date:
-            export_stock_from_date = datetime.now() - timedelta(30)
-        odoo_products = product_obj.get_products_based_on_movement_date_ept(export_stock_from_date,
-                                                                            instance.company_id)
-        instance.last_inventory_update_time = datetime.now()
-        woo_templates = woo_product_product_obj.search([('product_id', 'in', odoo_products),
-                                                        ('woo_is_manage_stock', '=', True)]).woo_template_id
-        woo_templates = woo_templates.filtered(lambda x: x.woo_instance_id == instance and x.exported_in_woo)
-        if woo_templates:
-            self.with_context(updated_products_in_inventory=odoo_products).woo_update_stock(instance, woo_templates)
-        else:
-            _logger.info("There is no product movement found between date time from: '%s'  to '%s' for export stock.",
-                         export_stock_from_date, datetime.now())
+        odoo_products = journal_cursor = False
+        journal_consumer = use_stock_journal and "woo.instance.ept,%s" % instance.id
+        with self.env['stock.change.journal.ept'].lock_journal_consumer_ept(journal_consumer) as is_locked:
+            if not is_locked:
+                return True
+            if use_stock_journal:
+                odoo_products, journal_cursor = product_obj.get_products_based_on_stock_journal_ept(
+                    journal_consumer, instance.company_id)
+            if not export_stock_from_date:
+                export_stock_from_date = datetime.now() - timedelta(30)
+            if odoo_products is False:
+                odoo_products = product_obj.get_products_based_on_movement_date_ept(export_stock_from_date,
+                                                                                    instance.company_id)
+            instance.last_inventory_update_time = datetime.now()
+            woo_templates = woo_product_product_obj.search([('product_id', 'in', odoo_products),
+                                                            ('woo_is_manage_stock', '=', True)]).woo_template_id
+            woo_templates = woo_templates.filtered(lambda x: x.woo_instance_id == instance and x.exported_in_woo)
+            if woo_templates:
+                self.with_context(updated_products_in_inventory=odoo_products).woo_update_stock(instance,
+                                                                                              woo_templates)
+            else:
+                _logger.info("There is no product movement found between date time from: '%s'  to '%s' for export "
+                             "stock.", export_stock_from_date, datetime.now())
+            if journal_cursor:
+                self.env['stock.change.journal.ept'].set_journal_cursor_ept(journal_consumer, journal_cursor)
         return True
 
     @api.model
@@ -42,21 +42,15 @@ class ResPartner(models.Model):
             return []
         return data
 
-    def woo_import_all_customers(self, wc_api, common_log_id, page, woo_process_import_export_id):
+    def woo_import_all_customers(self, res, common_log_id, woo_process_import_export_id):
         """
-        This method used to request for the customer page.
-        @param : self, wc_api, common_log_id, page, woo_process_import_export_id
+        This method used to create the queue of a customer page.
+        @param : self, res, common_log_id, woo_process_import_export_id
+        @param res: Response of a customers page.
         @author: Maulik Barad on Date 30-Oct-2020.
         Migrated by Maulik Barad on Date 07-Oct-2021.
         """
         queue_ids = []
-
-        try:
-            res = wc_api.get('customers', params={"per_page": 100, 'page': page})
-        except Exception as error:
-            raise UserError(_("Something went wrong while importing Customers.\n\nPlease Check your Connection and "
-                              "Instance Configuration.\n\n" + str(error)))
-
         response = self.woo_check_proper_response(res, common_log_id)
         if response:
             queue_ids = self.create_woo_customer_queue(response, woo_process_import_export_id).ids
@@ -88,8 +82,8 @@ class ResPartner(models.Model):
         if int(total_pages) >= 2:
             queues = self.create_woo_customer_queue(customers, woo_process_import_export_id)
             customer_queues += queues.ids
-            for page in range(2, int(total_pages) + 1):
-                queue_ids = self.woo_import_all_customers(wc_api, common_log_id, page, woo_process_import_export_id)
+            for page_res in instance.woo_get_pages("customers", total_pages, {"per_page": 100}, "Customers"):
+                queue_ids = self.woo_import_all_customers(page_res, common_log_id, woo_process_import_export_id)
                 customer_queues += queue_ids
         else:
             queues = self.create_woo_customer_queue(customers, woo_process_import_export_id)
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 # See LICENSE file for full copyright and licensing details.
-import ast
 import logging
 import time
 from datetime import timedelta, datetime
@@ -173,27 +172,19 @@ class SaleOrder(models.Model):
 
         return order_data_queue
 
-    def import_all_orders(self, total_pages, params, wc_api, woo_instance, order_type):
+    def import_all_orders(self, total_pages, params, woo_instance, order_type):
         """
         This method is used to import orders if there are more one page data.
         @param order_type: Type of order.
         @param total_pages: Total pages of data.
         @param params: Parameters to pass in API.
-        @param wc_api: WC API Object.
         @param woo_instance: Record of Instance.
         @return: All data of orders and Ids of the order data queue.
         @author: Maulik Barad on Date 02-Nov-2020.
         Migrated by Maulik Barad on Date 07-Oct-2021.
         """
         order_queue_ids = []
-        for page in range(2, int(total_pages) + 1):
-            params["page"] = page
-            try:
-                response = wc_api.get("orders", params=params)
-            except Exception as error:
-                raise UserError(_("Something went wrong while importing Orders.\n\nPlease Check your Connection and "
-                                  "Instance Configuration.\n\n" + str(error)))
-
+        for response in woo_instance.woo_get_pages("orders", total_pages, params, "Orders"):
             orders_response = response.json()
             order_queue_ids += self.create_woo_order_data_queue(woo_instance, orders_response, order_type).ids
 
@@ -245,7 +236,7 @@ class SaleOrder(models.Model):
 
         total_pages = response.headers.get("X-WP-TotalPages")
         if int(total_pages) > 1:
-            order_queue_ids = self.import_all_orders(total_pages, params, wc_api, woo_instance, order_type)
+            order_queue_ids = self.import_all_orders(total_pages, params, woo_instance, order_type)
             order_queues += order_queue_ids
 
         if not common_log_book_id.log_lines:
@@ -680,7 +671,7 @@ class SaleOrder(models.Model):
         Migrated by Maulik Barad on Date 07-Oct-2021.
         """
         if is_process_from_queue:
-            order_data = ast.literal_eval(queue_line.order_data)
+            order_data = queue_line.get_payload_ept()
             queue_line.processed_at = fields.Datetime.now()
         else:
             order_data = queue_line
@@ -697,6 +688,11 @@ class SaleOrder(models.Model):
         @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 4 September 2020 .
         Migrated by Maulik Barad on Date 07-Oct-2021.
         """
+        if "woo_customer_index" not in self._context:
+            customer_index, partner_index = self.prepare_woo_customer_index(queue_lines)
+            return self.with_context(woo_customer_index=customer_index,
+                                     partner_index_ept=partner_index).create_woo_orders(queue_lines,
+                                                                                        common_log_book_id)
         new_orders = self
         woo_instance = False
         commit_count = 0
@@ -706,14 +702,15 @@ class SaleOrder(models.Model):
         for queue_line in queue_lines:
             commit_count += 1
             if commit_count == 5:
-                queue_line.order_data_queue_id.is_process_queue = True
+                queue_line.order_data_queue_id.write({"is_process_queue": True,
+                                                      "process_heartbeat": fields.Datetime.now()})
                 self._cr.commit()
                 commit_count = 0
             if woo_instance != queue_line.instance_id:
                 woo_instance = queue_line.instance_id
                 woo_taxes = {}
 
-            order_data = ast.literal_eval(queue_line.order_data)
+            order_data = queue_line.get_payload_ept()
             queue_line.processed_at = fields.Datetime.now()
 
             if str(woo_instance.import_order_after_date) > order_data.get("date_created_gmt"):
@@ -897,10 +894,14 @@ class SaleOrder(models.Model):
             self.create_woo_log_lines(message, common_log_book_id, queue_line)
             return False, False, False
 
-        woo_partner = woo_partner_obj.search([("woo_customer_id", "=", order_data.get('customer_id')),
-                                              ("woo_instance_id", "=", woo_instance.id)], limit=1)
-        if woo_partner:
-            partner = woo_partner.partner_id
+        customer_index = self._context.get("woo_customer_index", {}).get(woo_instance.id, {})
+        if str(order_data.get('customer_id')) in customer_index:
+            partner = partner_obj.browse(customer_index[str(order_data.get('customer_id'))])
+        else:
+            woo_partner = woo_partner_obj.search([("woo_customer_id", "=", order_data.get('customer_id')),
+                                                  ("woo_instance_id", "=", woo_instance.id)], limit=1)
+            if woo_partner:
+                partner = woo_partner.partner_id
 
         billing_partner = partner_obj.woo_create_or_update_customer(order_data.get("billing"), woo_instance, partner,
                                                                     'invoice', order_data.get('customer_id', False))
@@ -913,6 +914,39 @@ class SaleOrder(models.Model):
 
         return partner, billing_partner, shipping_partner
 
+    def prepare_woo_customer_index(self, queue_lines):
+        """
+        This method is used to resolve the customers and billing addresses of all the orders of the queue lines at
+        once. The WooCommerce customers are searched in one query and the addresses through the partner index of the
+        common connector.
+        @param queue_lines: Records of the order queue lines.
+        @return: Dictionary of instance id and its dictionary of WooCommerce customer id and partner id, and the
+        partner index.
+        """
+        partner_obj = self.env['res.partner']
+        woo_partner_obj = self.env['woo.res.partner.ept']
+        customer_ids = set()
+        address_vals_list = []
+        for queue_line in queue_lines:
+            order_data = queue_line.get_payload_ept()
+            if order_data.get('customer_id'):
+                customer_ids.add(str(order_data.get('customer_id')))
+            billing = order_data.get('billing') or {}
+            if billing.get('first_name') or billing.get('last_name'):
+                address_vals_list.append(partner_obj.woo_prepare_partner_vals(billing, queue_line.instance_id))
+
+        customer_index = {}
+        if customer_ids:
+            woo_partners = woo_partner_obj.search_read([('woo_customer_id', 'in', list(customer_ids)),
+                                                        ('woo_instance_id', 'in', queue_lines.instance_id.ids)],
+                                                       ['woo_customer_id', 'woo_instance_id', 'partner_id'],
+                                                       order='id')
+            for woo_partner in woo_partners:
+                if woo_partner['partner_id'] and woo_partner['woo_instance_id']:
+                    customer_index.setdefault(woo_partner['woo_instance_id'][0], {}).setdefault(
+                        woo_partner['woo_customer_id'], woo_partner['partner_id'][0])
+        return customer_index, partner_obj.prepare_partner_index_ept(address_vals_list=address_vals_list)
+
     def find_or_create_delivery_carrier(self, shipping_product_id, delivery_method, shipping_line):
         """
         Find or create the carrier for the shipping line.
@@ -1045,8 +1079,14 @@ class SaleOrder(models.Model):
             else:
                 continue
 
-        for woo_orders in split_every(100, woo_order_ids):
-            log_line_id = self.update_order_status_in_batch(woo_orders, wc_api, woo_instance)
+        batches = [('orders/batch', {'update': list(woo_orders)}) for woo_orders in split_every(100, woo_order_ids)]
+        for _endpoint, data, response, error in wc_api.post_batches(batches):
+            if error:
+                message = "Something went wrong while Updating Orders' Status.\n%s" % error
+                _logger.info(message)
+                log_line_id = self.create_woo_log_lines(message).id
+            else:
+                log_line_id = self.process_order_status_batch_response(data.get('update'), response, woo_instance)
             if log_line_id:
                 if isinstance(log_line_id, list):
                     log_lines += log_line_id
@@ -1061,20 +1101,14 @@ class SaleOrder(models.Model):
                 self.woo_create_schedule_activity_against_logbook(log_book, message)
         return True
 
-    def update_order_status_in_batch(self, woo_orders, wc_api, woo_instance):
+    def process_order_status_batch_response(self, woo_orders, response, woo_instance):
         """
-        This method is used to update orders in the batch from Odoo to the Woocommerce store.
+        This method is used to mark the orders of a status batch as updated, which are accepted by Woocommerce and
+        to create log lines for the others.
         :param woo_orders: list of dictionary with woo order id and status.
-        :param wc_api: Object of Woocommerce rest API.
+        :param response: Response of the orders/batch request.
         :param woo_instance: Browsable record of instance.
-        @author: Haresh Mori @Emipro Technologies Pvt. Ltd on date 26 November 2020 .
-        Migrated by Maulik Barad on Date 07-Oct-2021.
         """
-        try:
-            response = wc_api.post('orders/batch', {'update': list(woo_orders)})
-        except Exception as error:
-            raise UserError(_("Something went wrong while Updating Orders' Status.\n\nPlease Check your Connection and "
-                              "Instance Configuration.\n\n" + str(error)))
         if response.status_code not in [200, 201]:
             _logger.info("Could not update status batch")
             message = "Error in updating order status batch"
@@ -1186,7 +1220,7 @@ class SaleOrder(models.Model):
         woo_instance = log_book.woo_instance_id
         for queue_line in queue_lines:
             message = ""
-            order_data = ast.literal_eval(queue_line.order_data)
+            order_data = queue_line.get_payload_ept()
             queue_line.processed_at = fields.Datetime.now()
             woo_status = order_data.get("status")
             order = self.search([("woo_instance_id", "=", woo_instance.id),
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import models, api
+
+
+class StockChangeJournalEpt(models.Model):
+    _inherit = "stock.change.journal.ept"
+
+    @api.model
+    def notify_stock_changes_ept(self, company_ids):
+        """ Inherited for scheduling the stock push of the WooCommerce instances of the companies.
+        """
+        self.env["woo.product.template.ept"].trigger_stock_push_in_woo(company_ids)
+        return super(StockChangeJournalEpt, self).notify_stock_changes_ept(company_ids)
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+# See LICENSE file for full copyright and licensing details.
+from odoo import models, fields
+
+
+class WooStockExportSnapshotEpt(models.Model):
+    _name = "woo.stock.export.snapshot.ept"
+    _inherit = "stock.export.snapshot.mixin.ept"
+    _description = "WooCommerce Last Exported Stock"
+
+    _snapshot_scope_fields = ("woo_instance_id",)
+    _snapshot_product_field = "woo_product_id"
+
+    woo_instance_id = fields.Many2one("woo.instance.ept", "Instance", required=True, ondelete="cascade")
+    woo_product_id = fields.Many2one("woo.product.product.ept", "Product", required=True, ondelete="cascade")
+
+    _sql_constraints = [("unique_woo_stock_export_snapshot", "unique(woo_instance_id, woo_product_id)",
+                         "The exported stock of a product can be stored only once per instance.")]
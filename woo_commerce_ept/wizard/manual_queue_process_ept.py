@@ -40,9 +40,11 @@ class WooManualQueueProcessEpt(models.TransientModel):
             lambda x: x.state != "done")
         if model == 'woo.order.data.queue.line.ept':
             order_queue_ids = order_queue_ids.mapped('order_data_queue_id').filtered(lambda x: x.state != "done")
-        self.env.cr.execute(
-            """update woo_order_data_queue_ept set is_process_queue = False where is_process_queue = True""")
-        self._cr.commit()
+        # Only the selected queues are released, the queues claimed by the cron workers are left alone.
+        if order_queue_ids:
+            self.env.cr.execute("""update woo_order_data_queue_ept set is_process_queue = False
+                                where is_process_queue = True and id in %s""", (tuple(order_queue_ids.ids),))
+            self._cr.commit()
         for order_queue_id in order_queue_ids:
             order_queue_line_batch = order_queue_id.order_data_queue_line_ids.filtered(
                 lambda x: x.state in ["draft", "failed"])
@@ -703,8 +703,8 @@ class WooProcessImportExport(models.TransientModel):
                 continue
             odoo_products = woo_templates.woo_product_ids.mapped('product_id').ids
             woo_product_tmpl_obj.with_context(
-                updated_products_in_inventory=odoo_products).woo_update_stock(instance,
-                                                                              woo_templates)
+                updated_products_in_inventory=odoo_products,
+                is_process_from_selected_product=True).woo_update_stock(instance, woo_templates)
 
     def update_export_category_tags_coupons_in_woo(self):
         """
@@ -231,6 +231,8 @@ class ResConfigSettings(models.TransientModel):
                                       help="Choose the field by which you want to update the stock in WooCommerce "
                                            "based on Free To Use(Quantity On Hand - Outgoing + Incoming) or "
                                            "Forecasted Quantity (Quantity On Hand - Reserved quantity).")
+    woo_stock_push = fields.Boolean("Push Stock Changes", help="Export the stock of the products a few seconds after "
+                                                               "it changes, besides the stock auto update cron.")
 
     woo_pricelist_id = fields.Many2one('product.pricelist', string='Woo Instance Pricelist',
                                        help="Product Price will be stored in this pricelist in Odoo.")
@@ -342,6 +344,7 @@ class ResConfigSettings(models.TransientModel):
         if instance:
             self.woo_lang_id = instance.woo_lang_id.id if instance.woo_lang_id else False
             self.woo_stock_field = instance.woo_stock_field.id if instance.woo_stock_field else False
+            self.woo_stock_push = instance.woo_stock_push
             self.woo_warehouse_id = instance.woo_warehouse_id.id if instance.woo_warehouse_id else False
             self.woo_pricelist_id = instance.woo_pricelist_id.id if instance.woo_pricelist_id else False
             self.woo_payment_term_id = instance.woo_payment_term_id.id if instance.woo_payment_term_id else False
@@ -386,6 +389,7 @@ class ResConfigSettings(models.TransientModel):
         if instance:
             values['woo_lang_id'] = self.woo_lang_id.id if self.woo_lang_id else False
             values['woo_stock_field'] = self.woo_stock_field.id if self.woo_stock_field else False
+            values['woo_stock_push'] = self.woo_stock_push
             values['woo_warehouse_id'] = self.woo_warehouse_id.id if self.woo_warehouse_id else False
             values['woo_pricelist_id'] = self.woo_pricelist_id.id if self.woo_pricelist_id else False
             values[
@@ -9,7 +9,12 @@ __version__ = "2.1.1"
 __author__ = "Claudio Sanches @ Automattic"
 __license__ = "MIT"
 
-from requests import request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from requests import Session
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
 from json import dumps as jsonencode
 from time import time
 from .oauth import OAuth
@@ -33,6 +38,26 @@ class API(object):
         self.timeout = kwargs.get("timeout", 60)
         self.verify_ssl = kwargs.get("verify_ssl", True)
         self.query_string_auth = kwargs.get("query_string_auth", False)
+        self.session = kwargs.get("session") or self.__get_session(kwargs.get("pool_maxsize", 10))
+        # Parallel requests (pages, batches) sent at the same time to this store, by all the threads using this client.
+        self.max_workers = kwargs.get("max_workers", 3)
+        self.semaphore = BoundedSemaphore(self.max_workers)
+        # Time until which the store asked to slow down with a 429 response.
+        self.throttled_until = 0
+
+    def __get_session(self, pool_maxsize):
+        """ Create a keep-alive session with a connection pool of pool_maxsize connections per host """
+        session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # No cookie is needed by the API, so the shared session never changes and can be used by several threads.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def close(self):
+        """ Close the pooled connections """
+        self.session.close()
 
     def __is_ssl(self):
         """ Check if url use HTTPS """
@@ -72,7 +97,9 @@ class API(object):
         auth = None
         headers = {
             "user-agent": "WooCommerce API Client-Python/%s" % __version__,
-            "accept": "application/json"
+            "accept": "application/json",
+            "accept-encoding": "gzip, deflate",
+            "connection": "keep-alive"
         }
 
         if self.is_ssl is True and self.query_string_auth is False:
@@ -91,7 +118,7 @@ class API(object):
             data = jsonencode(data, ensure_ascii=False).encode('utf-8')
             headers["content-type"] = "application/json;charset=utf-8"
 
-        return request(
+        response = self.session.request(
             method=method,
             url=url,
             verify=self.verify_ssl,
@@ -102,6 +129,17 @@ class API(object):
             headers=headers,
             **kwargs
         )
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = 10
+            self.throttled_until = max(self.throttled_until, time() + retry_after)
+        return response
+
+    def throttle_delay(self):
+        """ Seconds to wait before calling the store again, after it answered with 429 """
+        return max(0, self.throttled_until - time())
 
     def get(self, endpoint, **kwargs):
         """ Get requests """
@@ -119,6 +157,45 @@ class API(object):
         """ DELETE requests """
         return self.__request("DELETE", endpoint, None, **kwargs)
 
+    def __map_parallel(self, function, items):
+        """ Call function for each item on a thread pool of max_workers threads.
+        Yield the futures in the order of the items, at most max_workers calls are started ahead """
+        def call(item):
+            with self.semaphore:
+                return function(item)
+
+        futures = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for item in items:
+                    futures.append(executor.submit(call, item))
+                    if len(futures) >= self.max_workers:
+                        yield futures.popleft()
+                while futures:
+                    yield futures.popleft()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def get_pages(self, endpoint, first_page, last_page, params=None, **kwargs):
+        """ Get the pages first_page..last_page of a list endpoint, several pages are fetched in parallel.
+        The responses are yielded in page order, an error is raised when its page is reached """
+        params = dict(params or {})
+        pages = range(first_page, last_page + 1)
+        for future in self.__map_parallel(lambda page: self.get(endpoint, params=dict(params, page=page), **kwargs),
+                                          pages):
+            yield future.result()
+
+    def post_batches(self, batches, **kwargs):
+        """ POST several (endpoint, data) batch requests in parallel.
+        Yield (endpoint, data, response, error) in the order of the batches, error is the exception
+        raised by the request, if any, so one failed batch does not stop the others """
+        batches = list(batches)
+        futures = self.__map_parallel(lambda batch: self.post(batch[0], batch[1], **kwargs), batches)
+        for (endpoint, data), future in zip(batches, futures):
+            error = future.exception()
+            yield endpoint, data, None if error else future.result(), error
+
     def options(self, endpoint, **kwargs):
         """ OPTIONS requests """
         return self.__request("OPTIONS", endpoint, None, **kwargs)